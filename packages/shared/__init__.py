@@ -1,11 +1,37 @@
 """
 Shared utilities and templates for Luster AI
+
+Exports are resolved lazily (PEP 562) so importing the package does not
+load prompt_loader until one of its names is actually used.
 """
 
-from .prompt_loader import build_prompt, get_available_styles, VALID_STYLES
+from __future__ import annotations
+
+import importlib
+from typing import Any
+
+# Public name -> (submodule, attribute). Single source for the package exports.
+_LAZY_MAP = {
+    'build_prompt': ('.prompt_loader', 'build_prompt'),
+    'get_available_styles': ('.prompt_loader', 'get_available_styles'),
+    'STYLE_NAMES': ('.prompt_loader', 'STYLE_NAMES'),
+    'VALID_STYLES': ('.prompt_loader', 'VALID_STYLES'),
+}
+
+__all__ = list(_LAZY_MAP)
+
+
+def __getattr__(name: str) -> Any:
+    try:
+        module_name, attr = _LAZY_MAP[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+
+    value = getattr(importlib.import_module(module_name, __name__), attr)
+    # Cache on the package so later lookups bypass __getattr__
+    globals()[name] = value
+    return value
+
 
-__all__ = [
-    'build_prompt',
-    'get_available_styles',
-    'VALID_STYLES',
-]
+def __dir__() -> list[str]:
+    return sorted({*globals(), *__all__})
@@ -11,18 +11,28 @@ Usage:
     styles = get_available_styles()
 """
 
+from collections.abc import Mapping
+from functools import lru_cache
 from pathlib import Path
+from types import MappingProxyType
 
 PROMPTS_DIR = Path(__file__).parent / "prompts"
 
-VALID_STYLES = {"bright", "neutral", "warm", "evening", "noir", "soft"}
+VALID_STYLES = frozenset({"bright", "neutral", "warm", "evening", "noir", "soft"})
 
 # Default style used when none specified or style is invalid
 DEFAULT_STYLE = "neutral"
 
+# Prompt file paths are fixed at import; resolve them once
+_DEFAULT_PROMPT_PATH = PROMPTS_DIR / "default.md"
+_STYLE_PROMPT_PATHS = {
+    style: PROMPTS_DIR / "styles" / f"style_{style}.md" for style in VALID_STYLES
+}
 
-def _read(path: Path) -> str:
-    return path.read_text(encoding="utf-8").strip()
+
+def clear_cache() -> None:
+    """Drop cached prompts so edited prompt files are re-read."""
+    _merge_prompt.cache_clear()
 
 
 def build_prompt(style: str = DEFAULT_STYLE) -> str:
@@ -39,15 +49,37 @@ def build_prompt(style: str = DEFAULT_STYLE) -> str:
     if style not in VALID_STYLES:
         style = DEFAULT_STYLE
 
-    default_text = _read(PROMPTS_DIR / "default.md")
-    style_text = _read(PROMPTS_DIR / "styles" / f"style_{style}.md")
+    return _merge_prompt(style)
+
+
+@lru_cache(maxsize=None)
+def _merge_prompt(style: str) -> str:
+    """
+    Read and merge the prompt files for a validated style key.
+
+    Cached per style: the key space is VALID_STYLES, so the cache is bounded.
+    Call clear_cache() after editing the prompt files.
+    """
+    default_text = _DEFAULT_PROMPT_PATH.read_text(encoding="utf-8").strip()
+    style_text = _STYLE_PROMPT_PATHS[style].read_text(encoding="utf-8").strip()
 
     return f"{style_text}\n\n{default_text}"
 
 
-def get_available_styles() -> dict[str, str]:
-    """Return mapping of style key -> display name."""
-    return {
+def warmup() -> None:
+    """
+    Build the merged prompt for every style.
+
+    Call at process startup so the first request never reads from disk;
+    raises OSError if a prompt file can't be read.
+    """
+    for style in VALID_STYLES:
+        _merge_prompt(style)
+
+
+# Style key -> display name (read-only, shared by all callers)
+STYLE_NAMES: Mapping[str, str] = MappingProxyType(
+    {
         "bright": "Bright",
         "neutral": "Neutral",
         "warm": "Warm",
@@ -55,3 +87,9 @@ def get_available_styles() -> dict[str, str]:
         "noir": "Noir",
         "soft": "Soft",
     }
+)
+
+
+def get_available_styles() -> Mapping[str, str]:
+    """Return read-only mapping of style key -> display name."""
+    return STYLE_NAMES
@@ -0,0 +1,73 @@
+"""Allow at most one credits_refunded event per job
+
+Revision ID: a8b9c0d1e2f3
+Revises: f7a8b9c0d1e2
+Create Date: 2026-10-16 17:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "a8b9c0d1e2f3"
+down_revision: Union[str, Sequence[str], None] = "f7a8b9c0d1e2"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Relabel duplicate refund events, then index refunds uniquely per job."""
+    # Keep the earliest refund event; later ones stay in the audit trail
+    # under their own type so the unique index can build
+    op.execute(
+        """
+        UPDATE job_events
+        SET event_type = 'credits_refunded_duplicate'
+        FROM (
+            SELECT id, ROW_NUMBER() OVER (
+                PARTITION BY job_id ORDER BY created_at, id
+            ) AS position
+            FROM job_events
+            WHERE event_type = 'credits_refunded'
+        ) AS ranked
+        WHERE job_events.id = ranked.id AND ranked.position > 1
+        """
+    )
+    # CONCURRENTLY can't run inside a transaction; avoids locking event writes
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "idx_job_events_one_refund",
+            "job_events",
+            ["job_id"],
+            unique=True,
+            postgresql_where=sa.text("event_type = 'credits_refunded'"),
+            postgresql_concurrently=True,
+        )
+        # Covered by the unique index
+        op.drop_index(
+            "idx_job_events_refund",
+            table_name="job_events",
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Restore the non-unique refund event index."""
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "idx_job_events_refund",
+            "job_events",
+            ["job_id"],
+            unique=False,
+            postgresql_where=sa.text("event_type = 'credits_refunded'"),
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            "idx_job_events_one_refund",
+            table_name="job_events",
+            postgresql_concurrently=True,
+        )
@@ -0,0 +1,58 @@
+"""Add partial indexes for recent worker activity queries
+
+Revision ID: b3c4d5e6f7a8
+Revises: a2f3b4c5d6e7
+Create Date: 2026-10-16 12:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "b3c4d5e6f7a8"
+down_revision: Union[str, Sequence[str], None] = "a2f3b4c5d6e7"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Index the recent tail of processing and finished jobs."""
+    # CONCURRENTLY can't run inside a transaction; avoids locking jobs writes
+    with op.get_context().autocommit_block():
+        # Jobs finished in the last N minutes (admin worker activity)
+        op.create_index(
+            "idx_jobs_completed_recent",
+            "jobs",
+            [sa.text("completed_at DESC")],
+            unique=False,
+            postgresql_where=sa.text("status IN ('succeeded', 'failed')"),
+            postgresql_concurrently=True,
+        )
+        # Jobs currently being processed, by start time
+        op.create_index(
+            "idx_jobs_started_processing",
+            "jobs",
+            [sa.text("started_at DESC")],
+            unique=False,
+            postgresql_where=sa.text("status = 'processing'"),
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Remove recent worker activity partial indexes."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "idx_jobs_started_processing",
+            table_name="jobs",
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            "idx_jobs_completed_recent",
+            table_name="jobs",
+            postgresql_concurrently=True,
+        )
@@ -0,0 +1,43 @@
+"""Index shoots by user and recency
+
+Revision ID: b9c0d1e2f3a4
+Revises: a8b9c0d1e2f3
+Create Date: 2026-10-16 18:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "b9c0d1e2f3a4"
+down_revision: Union[str, Sequence[str], None] = "a8b9c0d1e2f3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Index a user's shoots by updated_at, newest first."""
+    # CONCURRENTLY can't run inside a transaction; avoids locking shoots writes
+    with op.get_context().autocommit_block():
+        # list_shoots orders a user's shoots by updated_at
+        op.create_index(
+            "idx_shoots_user_id_updated_at",
+            "shoots",
+            ["user_id", sa.text("updated_at DESC")],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Remove shoots user/updated_at index."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "idx_shoots_user_id_updated_at",
+            table_name="shoots",
+            postgresql_concurrently=True,
+        )
@@ -0,0 +1,54 @@
+"""Make shoot names unique per user
+
+Revision ID: c0d1e2f3a4b5
+Revises: b9c0d1e2f3a4
+Create Date: 2026-10-16 19:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "c0d1e2f3a4b5"
+down_revision: Union[str, Sequence[str], None] = "b9c0d1e2f3a4"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Rename duplicate shoot names, then index (user_id, name) uniquely."""
+    # Keep the oldest shoot's name; later duplicates get an ID-based suffix
+    op.execute(
+        """
+        UPDATE shoots
+        SET name = LEFT(shoots.name, 244) || ' (' || LEFT(shoots.id::text, 8) || ')'
+        FROM (
+            SELECT id, ROW_NUMBER() OVER (
+                PARTITION BY user_id, name ORDER BY created_at, id
+            ) AS position
+            FROM shoots
+        ) AS ranked
+        WHERE shoots.id = ranked.id AND ranked.position > 1
+        """
+    )
+    # CONCURRENTLY can't run inside a transaction; avoids locking shoots writes
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "idx_shoots_user_id_name",
+            "shoots",
+            ["user_id", "name"],
+            unique=True,
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Remove the unique shoot name index (renamed shoots keep their names)."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "idx_shoots_user_id_name",
+            table_name="shoots",
+            postgresql_concurrently=True,
+        )
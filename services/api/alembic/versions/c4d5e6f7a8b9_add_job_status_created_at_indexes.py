@@ -0,0 +1,56 @@
+"""Add status/created_at indexes for admin job listings
+
+Revision ID: c4d5e6f7a8b9
+Revises: b3c4d5e6f7a8
+Create Date: 2026-10-16 13:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "c4d5e6f7a8b9"
+down_revision: Union[str, Sequence[str], None] = "b3c4d5e6f7a8"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Index jobs by status and recency."""
+    # CONCURRENTLY can't run inside a transaction; avoids locking jobs writes
+    with op.get_context().autocommit_block():
+        # Status-filtered recent jobs and per-status counts
+        op.create_index(
+            "idx_jobs_status_created_at",
+            "jobs",
+            ["status", sa.text("created_at DESC")],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+        # Unfiltered recent jobs, newest first
+        op.create_index(
+            "idx_jobs_created_at",
+            "jobs",
+            [sa.text("created_at DESC")],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Remove status/created_at indexes."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "idx_jobs_created_at",
+            table_name="jobs",
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            "idx_jobs_status_created_at",
+            table_name="jobs",
+            postgresql_concurrently=True,
+        )
@@ -0,0 +1,66 @@
+"""Store job event details as JSONB and index refund events
+
+Revision ID: d5e6f7a8b9c0
+Revises: c4d5e6f7a8b9
+Create Date: 2026-10-16 14:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "d5e6f7a8b9c0"
+down_revision: Union[str, Sequence[str], None] = "c4d5e6f7a8b9"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Convert job_events.details to JSONB and index refund events."""
+    # Rows written as JSON text are parsed; plain-text admin notes are kept
+    # as JSON strings
+    op.alter_column(
+        "job_events",
+        "details",
+        existing_type=sa.Text(),
+        type_=postgresql.JSONB(astext_type=sa.Text()),
+        existing_nullable=True,
+        postgresql_using=(
+            "CASE WHEN details ~ '^\\s*[\\[{]' THEN details::jsonb "
+            "ELSE to_jsonb(details) END"
+        ),
+    )
+    # CONCURRENTLY can't run inside a transaction; avoids locking event writes
+    with op.get_context().autocommit_block():
+        # refund_job's "already refunded?" check
+        op.create_index(
+            "idx_job_events_refund",
+            "job_events",
+            ["job_id"],
+            unique=False,
+            postgresql_where=sa.text("event_type = 'credits_refunded'"),
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Remove refund event index and store details as text again."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "idx_job_events_refund",
+            table_name="job_events",
+            postgresql_concurrently=True,
+        )
+    op.alter_column(
+        "job_events",
+        "details",
+        existing_type=postgresql.JSONB(astext_type=sa.Text()),
+        type_=sa.Text(),
+        existing_nullable=True,
+        postgresql_using="details #>> '{}'",
+    )
@@ -0,0 +1,55 @@
+"""Add composite indexes for job event lookups and per-user job status
+
+Revision ID: e6f7a8b9c0d1
+Revises: d5e6f7a8b9c0
+Create Date: 2026-10-16 15:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "e6f7a8b9c0d1"
+down_revision: Union[str, Sequence[str], None] = "d5e6f7a8b9c0"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Index job events by job and type, and jobs by user and status."""
+    # CONCURRENTLY can't run inside a transaction; avoids locking writes
+    with op.get_context().autocommit_block():
+        # Event lookups by job and type (refund checks, worker reading the
+        # "created" event); job_events has no job_id index otherwise
+        op.create_index(
+            "idx_job_events_job_id_event_type",
+            "job_events",
+            ["job_id", "event_type"],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+        # A user's jobs in a given status
+        op.create_index(
+            "idx_jobs_user_id_status",
+            "jobs",
+            ["user_id", "status"],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Remove job event and per-user job status indexes."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "idx_jobs_user_id_status",
+            table_name="jobs",
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            "idx_job_events_job_id_event_type",
+            table_name="job_events",
+            postgresql_concurrently=True,
+        )
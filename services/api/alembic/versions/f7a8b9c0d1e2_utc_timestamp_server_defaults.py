@@ -0,0 +1,58 @@
+"""Default created_at/updated_at to the database's UTC time
+
+Revision ID: f7a8b9c0d1e2
+Revises: e6f7a8b9c0d1
+Create Date: 2026-10-16 16:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "f7a8b9c0d1e2"
+down_revision: Union[str, Sequence[str], None] = "e6f7a8b9c0d1"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TIMESTAMP_COLUMNS = [
+    ("users", "created_at"),
+    ("users", "updated_at"),
+    ("credits", "created_at"),
+    ("credits", "updated_at"),
+    ("shoots", "created_at"),
+    ("shoots", "updated_at"),
+    ("assets", "created_at"),
+    ("assets", "updated_at"),
+    ("jobs", "created_at"),
+    ("jobs", "updated_at"),
+    ("job_events", "created_at"),
+]
+
+
+def upgrade() -> None:
+    """Use UTC now() as the server default for row timestamps."""
+    # Columns are naive UTC; bare now() would follow the session time zone
+    for table, column in TIMESTAMP_COLUMNS:
+        op.alter_column(
+            table,
+            column,
+            existing_type=sa.DateTime(),
+            existing_nullable=True,
+            server_default=sa.text("TIMEZONE('utc', CURRENT_TIMESTAMP)"),
+        )
+
+
+def downgrade() -> None:
+    """Restore the previous now() server defaults."""
+    for table, column in TIMESTAMP_COLUMNS:
+        op.alter_column(
+            table,
+            column,
+            existing_type=sa.DateTime(),
+            existing_nullable=True,
+            server_default=sa.text("now()"),
+        )
@@ -5,16 +5,24 @@ Handles JWT verification using JWKS from Supabase, caching public keys,
 and providing FastAPI dependencies for authenticated endpoints.
 """
 
+import asyncio
+import hashlib
 import os
+import threading
 import time
+from collections import OrderedDict
 from typing import Any
 
+import httpx
 import jwt
-import requests
 from dotenv import load_dotenv
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
-from sqlalchemy.orm import Session
+from jwt.algorithms import RSAAlgorithm
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session, joinedload
 
 from database import Credit, User, get_db
 from logger import logger
@@ -39,6 +47,39 @@ JWT_AUDIENCE = "authenticated"  # Supabase default audience
 JWKS_CACHE_TTL = 3600  # 1 hour cache for JWKS
 _jwks_cache: dict[str, Any] | None = None
 _jwks_cache_time: float = 0
+_jwks_etag: str | None = None
+_jwks_keys: dict[str, Any] = {}  # kid -> parsed public key for _jwks_cache
+_jwks_refresh_task: asyncio.Task | None = None
+
+# Verified token claims, so repeat requests with the same token skip the
+# signature check. Entries never outlive the token's own exp.
+CLAIMS_CACHE_TTL = 60
+CLAIMS_CACHE_MAXSIZE = 4096
+_claims_cache: OrderedDict[bytes, tuple[float, dict[str, Any]]] = OrderedDict()
+_claims_lock = threading.Lock()
+
+# Pooled client for all Supabase calls (JWKS refreshes, auth endpoints) so
+# they reuse TLS connections and don't block the event loop
+_http_client: httpx.AsyncClient | None = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Return the shared Supabase HTTP client, creating it on first use."""
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(
+            timeout=10,
+            limits=httpx.Limits(max_connections=32, max_keepalive_connections=16),
+        )
+    return _http_client
+
+
+async def close_http_client() -> None:
+    """Close the shared HTTP client's connections (app shutdown)."""
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
 
 
 class AuthenticationError(Exception):
@@ -47,43 +88,46 @@ class AuthenticationError(Exception):
     pass
 
 
-def get_jwks() -> dict[str, Any]:
+async def _fetch_jwks() -> dict[str, Any]:
     """
-    Fetch JWKS (JSON Web Key Set) from Supabase with caching.
+    Fetch JWKS from Supabase and update the cache.
 
-    Returns:
-        Dict containing the JWKS
+    Revalidates with the stored ETag, so an unchanged key set is a 304
+    with no body.
 
     Raises:
-        AuthenticationError: If JWKS cannot be fetched
+        AuthenticationError: If JWKS cannot be fetched and nothing is cached
     """
-    global _jwks_cache, _jwks_cache_time
-
-    current_time = time.time()
-
-    # Return cached JWKS if still valid
-    if _jwks_cache and (current_time - _jwks_cache_time) < JWKS_CACHE_TTL:
-        return _jwks_cache
+    global _jwks_cache, _jwks_cache_time, _jwks_etag, _jwks_keys
 
-    # Fetch fresh JWKS
     if not SUPABASE_JWKS_URL:
         raise AuthenticationError("SUPABASE_JWKS_URL not configured")
 
+    headers = {"If-None-Match": _jwks_etag} if _jwks_cache and _jwks_etag else {}
+
     try:
         logger.info(f"Fetching JWKS from {SUPABASE_JWKS_URL}")
-        response = requests.get(SUPABASE_JWKS_URL, timeout=10)
+        response = await get_http_client().get(SUPABASE_JWKS_URL, headers=headers)
+
+        if response.status_code == 304 and _jwks_cache:
+            _jwks_cache_time = time.time()
+            logger.info("JWKS unchanged, cache revalidated")
+            return _jwks_cache
+
         response.raise_for_status()
 
         jwks: dict[str, Any] = response.json()
 
-        # Update cache
+        # Update cache; keys are parsed once per key set, not per request
+        _jwks_keys = _parse_jwks_keys(jwks)
         _jwks_cache = jwks
-        _jwks_cache_time = current_time
+        _jwks_cache_time = time.time()
+        _jwks_etag = response.headers.get("etag")
 
         logger.info("JWKS cache updated successfully")
         return jwks
 
-    except requests.exceptions.RequestException as e:
+    except (httpx.HTTPError, ValueError) as e:
         logger.error(f"Failed to fetch JWKS: {e}")
 
         # Return stale cache if available
@@ -94,6 +138,83 @@ def get_jwks() -> dict[str, Any]:
         raise AuthenticationError(f"Failed to fetch JWKS: {str(e)}")
 
 
+def _schedule_jwks_refresh() -> None:
+    """Refresh JWKS in the background, at most one refresh in flight."""
+    global _jwks_refresh_task
+
+    if _jwks_refresh_task is None or _jwks_refresh_task.done():
+        _jwks_refresh_task = asyncio.create_task(_fetch_jwks())
+
+
+async def get_jwks(force_refresh: bool = False) -> dict[str, Any]:
+    """
+    Get JWKS (JSON Web Key Set) from Supabase with caching.
+
+    Cached keys are served immediately; once they are past half the TTL a
+    background refresh is started (stale-while-revalidate), so requests
+    only wait on the network when nothing is cached or a refresh is forced.
+
+    Args:
+        force_refresh: Fetch now instead of using the cache (e.g. unknown kid)
+
+    Returns:
+        Dict containing the JWKS
+
+    Raises:
+        AuthenticationError: If JWKS cannot be fetched
+    """
+    if _jwks_cache and not force_refresh:
+        if time.time() - _jwks_cache_time >= JWKS_CACHE_TTL / 2:
+            _schedule_jwks_refresh()
+        return _jwks_cache
+
+    return await _fetch_jwks()
+
+
+def _parse_jwks_keys(jwks: dict[str, Any]) -> dict[str, Any]:
+    """Build kid -> RSA public key for every usable key in a JWKS."""
+    keys: dict[str, Any] = {}
+    for key in jwks.get("keys", []):
+        kid = key.get("kid")
+        if not kid:
+            continue
+        try:
+            keys[kid] = RSAAlgorithm.from_jwk(key)
+        except jwt.exceptions.InvalidKeyError as e:
+            logger.debug("Skipping non-RSA JWKS key", kid=kid, error=str(e))
+    return keys
+
+
+def _claims_key(token: str) -> bytes:
+    return hashlib.blake2b(token.encode(), digest_size=16).digest()
+
+
+def _get_cached_claims(key: bytes) -> dict[str, Any] | None:
+    with _claims_lock:
+        entry = _claims_cache.get(key)
+        if entry is None:
+            return None
+        expires_at, claims = entry
+        if expires_at <= time.time():
+            del _claims_cache[key]
+            return None
+        _claims_cache.move_to_end(key)
+        return claims
+
+
+def _cache_claims(key: bytes, claims: dict[str, Any]) -> None:
+    expires_at = time.time() + CLAIMS_CACHE_TTL
+    exp = claims["payload"].get("exp")
+    if isinstance(exp, (int, float)):
+        expires_at = min(expires_at, exp)
+
+    with _claims_lock:
+        _claims_cache[key] = (expires_at, claims)
+        _claims_cache.move_to_end(key)
+        if len(_claims_cache) > CLAIMS_CACHE_MAXSIZE:
+            _claims_cache.popitem(last=False)
+
+
 def get_public_key_from_jwks(token: str, jwks: dict[str, Any]) -> Any:
     """
     Extract the public key from JWKS based on token's kid (key ID).
@@ -116,14 +237,11 @@ def get_public_key_from_jwks(token: str, jwks: dict[str, Any]) -> Any:
         if not kid:
             raise AuthenticationError("Token missing 'kid' in header")
 
-        # Find matching key in JWKS
-        for key in jwks.get("keys", []):
-            if key.get("kid") == kid:
-                # Convert JWK to PEM format
-                from jwt.algorithms import RSAAlgorithm
-
-                public_key = RSAAlgorithm.from_jwk(key)
-                return public_key
+        # Find matching key; the cached key set is already parsed
+        keys = _jwks_keys if jwks is _jwks_cache else _parse_jwks_keys(jwks)
+        public_key = keys.get(kid)
+        if public_key is not None:
+            return public_key
 
         raise AuthenticationError(f"Public key not found for kid: {kid}")
 
@@ -131,7 +249,7 @@ def get_public_key_from_jwks(token: str, jwks: dict[str, Any]) -> Any:
         raise AuthenticationError(f"Invalid token format: {str(e)}")
 
 
-def verify_jwt_token(token: str) -> dict[str, Any]:
+async def verify_jwt_token(token: str) -> dict[str, Any]:
     """
     Verify JWT token from Supabase and extract claims.
 
@@ -144,7 +262,10 @@ def verify_jwt_token(token: str) -> dict[str, Any]:
     Raises:
         AuthenticationError: If token is invalid
     """
-    global _jwks_cache, _jwks_cache_time
+    cache_key = _claims_key(token)
+    cached = _get_cached_claims(cache_key)
+    if cached is not None:
+        return cached
 
     try:
         # Determine verification key based on configuration
@@ -154,16 +275,14 @@ def verify_jwt_token(token: str) -> dict[str, Any]:
             logger.debug("Using HS256 with JWT secret for verification")
         else:
             # Use asymmetric RS256 verification with JWKS
-            jwks = get_jwks()
+            jwks = await get_jwks()
             try:
                 verification_key = get_public_key_from_jwks(token, jwks)
             except AuthenticationError as e:
                 # If kid not found, force refresh JWKS cache and retry once
                 if "Public key not found for kid" in str(e):
                     logger.info("Kid not found in cache, forcing JWKS refresh")
-                    _jwks_cache = None
-                    _jwks_cache_time = 0
-                    jwks = get_jwks()
+                    jwks = await get_jwks(force_refresh=True)
                     verification_key = get_public_key_from_jwks(token, jwks)
                 else:
                     raise
@@ -190,11 +309,13 @@ def verify_jwt_token(token: str) -> dict[str, Any]:
 
         logger.info(f"Successfully verified token for user {user_id}")
 
-        return {
+        claims = {
             "user_id": user_id,
             "email": email,
             "payload": payload,
         }
+        _cache_claims(cache_key, claims)
+        return claims
 
     except jwt.exceptions.ExpiredSignatureError:
         raise AuthenticationError("Token has expired")
@@ -207,9 +328,51 @@ def verify_jwt_token(token: str) -> dict[str, Any]:
         raise AuthenticationError(f"Token verification failed: {str(e)}")
 
 
-def get_or_create_user(user_id: str, email: str | None, db: Session) -> User:
+# Dialects with INSERT ... ON CONFLICT, used to provision first-time users
+_UPSERT_INSERTS = {"postgresql": pg_insert, "sqlite": sqlite_insert}
+
+
+def _load_user(user_id: str, db: Session) -> User | None:
+    # Load the credit row in the same query since most callers read the
+    # balance next
+    return (
+        db.query(User)
+        .options(joinedload(User.credits))
+        .filter(User.id == user_id)
+        .first()
+    )
+
+
+def _provision_user(user_id: str, email: str, db: Session) -> None:
+    """Insert the user and a 0-balance credit row if they don't exist yet."""
+    insert = _UPSERT_INSERTS.get(db.get_bind().dialect.name)
+
+    if insert is None:
+        db.add(User(id=user_id, email=email))
+        db.flush()
+        db.add(Credit(user_id=user_id, balance=0))
+        return
+
+    # ON CONFLICT DO NOTHING: concurrent first logins for the same user both
+    # succeed instead of one failing on the primary key
+    db.execute(
+        insert(User)
+        .values(id=user_id, email=email)
+        .on_conflict_do_nothing(index_elements=[User.id])
+    )
+    db.execute(
+        insert(Credit)
+        .values(user_id=user_id, balance=0)
+        .on_conflict_do_nothing(index_elements=[Credit.user_id])
+    )
+
+
+def provision_user(user_id: str, email: str | None, db: Session) -> User:
     """
-    Get existing user or create new one with default credits.
+    Create a first-time user with a 0-balance credit row.
+
+    Only reached when the user lookup in _resolve_user misses, i.e. on the
+    first authenticated request after sign-up.
 
     Args:
         user_id: User ID from JWT
@@ -219,42 +382,37 @@ def get_or_create_user(user_id: str, email: str | None, db: Session) -> User:
     Returns:
         User object
     """
-    # Check if user exists
-    user = db.query(User).filter(User.id == user_id).first()
-
-    if user:
-        logger.info(f"Existing user found: {user_id}")
-        return user
-
-    # Create new user
     logger.info(f"Creating new user: {user_id} ({email})")
 
-    user = User(
-        id=user_id,
-        email=email or f"{user_id}@luster.app",  # Fallback email
-    )
-    db.add(user)
-    db.flush()
-
-    # Create credit record with 0 balance
-    credit = Credit(
-        user_id=user_id,
-        balance=0,
-    )
-    db.add(credit)
+    _provision_user(user_id, email or f"{user_id}@luster.app", db)  # Fallback email
     db.commit()
-    db.refresh(user)
+
+    user = _load_user(user_id, db)
 
     logger.info(f"New user created with 0 credits: {user_id}")
 
     return user
 
 
+def _resolve_user(request: Request, token_data: dict, db: Session) -> User:
+    user_id = token_data["user_id"]
+
+    # Known users cost a single SELECT; provisioning only runs on a miss
+    user = _load_user(user_id, db)
+    if user is None:
+        user = provision_user(user_id, token_data.get("email"), db)
+        request.state.user_provisioned = True
+
+    request.state.current_user = user
+    return user
+
+
 # FastAPI security scheme
 security = HTTPBearer(auto_error=False)
 
 
 async def get_current_user(
+    request: Request,
     credentials: HTTPAuthorizationCredentials | None = Depends(security),
     db: Session = Depends(get_db),
 ) -> User:
@@ -264,7 +422,7 @@ async def get_current_user(
     This function:
     1. Extracts JWT token from Authorization header
     2. Verifies the token using Supabase JWKS
-    3. Gets or creates user in our database
+    3. Loads the user, provisioning them on their first request
     4. Returns User object
 
     Usage in endpoints:
@@ -273,6 +431,7 @@ async def get_current_user(
             return {"user_id": user.id}
 
     Args:
+        request: Current request; the resolved user is kept on request.state
         credentials: HTTP Authorization credentials (Bearer token)
         db: Database session
 
@@ -282,6 +441,11 @@ async def get_current_user(
     Raises:
         HTTPException: 401 if authentication fails
     """
+    # Already resolved earlier in this request (e.g. by get_optional_user)
+    cached_user = getattr(request.state, "current_user", None)
+    if cached_user is not None:
+        return cached_user
+
     # Check if credentials provided
     if not credentials:
         logger.warning("No authorization credentials provided")
@@ -295,16 +459,10 @@ async def get_current_user(
 
     try:
         # Verify JWT token
-        token_data = verify_jwt_token(token)
+        token_data = await verify_jwt_token(token)
 
-        # Get or create user
-        user = get_or_create_user(
-            user_id=token_data["user_id"],
-            email=token_data.get("email"),
-            db=db,
-        )
-
-        return user
+        # Blocking SQLAlchemy calls; keep them off the event loop
+        return await run_in_threadpool(_resolve_user, request, token_data, db)
 
     except AuthenticationError as e:
         logger.warning(f"Authentication failed: {e}")
@@ -322,6 +480,7 @@ async def get_current_user(
 
 
 async def get_optional_user(
+    request: Request,
     credentials: HTTPAuthorizationCredentials | None = Depends(security),
     db: Session = Depends(get_db),
 ) -> User | None:
@@ -341,16 +500,15 @@ async def get_optional_user(
     if not credentials:
         return None
 
+    cached_user = getattr(request.state, "current_user", None)
+    if cached_user is not None:
+        return cached_user
+
     try:
-        token_data = verify_jwt_token(credentials.credentials)
-        user = get_or_create_user(
-            user_id=token_data["user_id"],
-            email=token_data.get("email"),
-            db=db,
-        )
-        return user
+        token_data = await verify_jwt_token(credentials.credentials)
+        return await run_in_threadpool(_resolve_user, request, token_data, db)
     except (AuthenticationError, Exception) as e:
-        logger.debug(f"Optional auth failed: {e}")
+        logger.debug("Optional auth failed", error=str(e))
         return None
 
 
@@ -10,13 +10,13 @@ These endpoints interface with Supabase Auth for:
 import os
 from typing import Optional
 
-import requests
+import httpx
 from dotenv import load_dotenv
 from fastapi import APIRouter, Depends, HTTPException, status
 from pydantic import BaseModel, EmailStr
 from sqlalchemy.orm import Session
 
-from auth import get_current_user, get_optional_user
+from auth import get_current_user, get_http_client, get_optional_user
 from database import User, get_db
 from logger import logger
 
@@ -95,7 +95,9 @@ async def send_magic_link(request: MagicLinkRequest):
     try:
         logger.info(f"Sending magic link to {request.email}")
 
-        response = requests.post(auth_url, json=payload, headers=headers, timeout=10)
+        response = await get_http_client().post(
+            auth_url, json=payload, headers=headers
+        )
         response.raise_for_status()
 
         logger.info(f"Magic link sent successfully to {request.email}")
@@ -104,13 +106,13 @@ async def send_magic_link(request: MagicLinkRequest):
             message="Magic link sent! Check your email to sign in.", email=request.email
         )
 
-    except requests.exceptions.HTTPError as e:
+    except httpx.HTTPStatusError as e:
         logger.error(f"Supabase Auth API error: {e}")
-        logger.error(f"Response: {e.response.text if e.response else 'No response'}")
+        logger.error(f"Response: {e.response.text}")
 
         # Try to extract error message from Supabase
         try:
-            error_data = e.response.json() if e.response else {}
+            error_data = e.response.json()
             error_message = error_data.get("msg", str(e))
         except Exception:
             error_message = str(e)
@@ -119,7 +121,7 @@ async def send_magic_link(request: MagicLinkRequest):
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to send magic link: {error_message}",
         )
-    except requests.exceptions.RequestException as e:
+    except httpx.RequestError as e:
         logger.error(f"Network error sending magic link: {e}")
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
@@ -205,10 +207,8 @@ async def get_current_user_info(
     Returns:
         User profile information
     """
-    from database import Credit
-
-    # Get user's credit balance
-    credit = db.query(Credit).filter(Credit.user_id == user.id).first()
+    # Credit row is loaded together with the user by get_current_user
+    credit = user.credits
 
     return {
         "id": str(user.id),
@@ -3,25 +3,53 @@ Credit Service - Centralized credit operations
 
 This module provides reusable functions for credit management including:
 - Credit deduction (reservation at job creation)
-- Credit refund (on job failure)
+- Job creation with its credit reservation, in one transaction
+- Credit refund (on job failure), single or in bulk
 - Credit validation
 """
 
-import json
+from collections import defaultdict
+from collections.abc import Iterable
 from typing import cast
 
+from sqlalchemy import insert, inspect, select, update
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
-from database import Credit, Job, JobEvent, JobStatus
+from database import Credit, Job, JobEvent, JobStatus, User, generate_uuid
+
+# Rows per multi-row INSERT; keeps bind parameters well under Postgres' limit
+EVENT_INSERT_CHUNK_SIZE = 500
+
+# Session.info key for the per-session user_id -> Credit memo
+CREDIT_CACHE_KEY = "credit_by_user_id"
 
 
 def get_or_create_credit(db: Session, user_id: str) -> Credit:
-    """Get user's credit record, creating one with 0 balance if none exists"""
-    credit = db.query(Credit).filter(Credit.user_id == user_id).first()
+    """
+    Get user's credit record, creating one with 0 balance if none exists.
+
+    The row is memoized on the session (one per request via get_db), so
+    repeat lookups in the same request skip the SELECT, as does the first
+    one when the user was loaded with their credits.
+    """
+    cache = db.info.setdefault(CREDIT_CACHE_KEY, {})
+    credit = cache.get(user_id)
+    # A rollback can evict a row this session created; look it up again
+    if credit is not None and credit in db:
+        return credit
+
+    # get_current_user loads the credit row together with the user
+    user = db.identity_map.get(db.identity_key(User, user_id))
+    if user is not None and "credits" not in inspect(user).unloaded:
+        credit = user.credits
+    else:
+        credit = db.query(Credit).filter(Credit.user_id == user_id).first()
     if not credit:
         credit = Credit(user_id=user_id, balance=0)
         db.add(credit)
         db.flush()
+    cache[user_id] = credit
     return credit
 
 
@@ -38,29 +66,75 @@ def validate_credits(db: Session, user_id: str, required: int) -> tuple[bool, Cr
     return balance >= required, credit
 
 
-def deduct_credits(db: Session, user_id: str, amount: int) -> Credit:
+def deduct_credits(db: Session, user_id: str, amount: int) -> int:
     """
     Deduct credits from user's balance.
     Should be called at job creation as a reservation.
 
+    The balance check and decrement are a single UPDATE ... RETURNING, so
+    concurrent deductions can't both spend the same credits.
+
+    Returns:
+        New balance
+
     Raises:
         ValueError if insufficient credits
     """
-    credit = get_or_create_credit(db, user_id)
-    balance = cast(int, credit.balance)
-    if balance < amount:
+    new_balance = db.execute(
+        update(Credit)
+        .where(Credit.user_id == user_id, Credit.balance >= amount)
+        .values(balance=Credit.balance - amount)
+        .returning(Credit.balance)
+    ).scalar()
+
+    if new_balance is None:
+        balance = db.scalar(select(Credit.balance).where(Credit.user_id == user_id))
         raise ValueError(
-            f"Insufficient credits. Required: {amount}, Available: {balance}"
+            f"Insufficient credits. Required: {amount}, Available: {balance or 0}"
         )
 
-    credit.balance = balance - amount  # type: ignore[assignment]
-    db.flush()
-    return credit
+    return new_balance
+
+
+def create_job_atomic(
+    db: Session,
+    user_id: str,
+    asset_id: str,
+    prompt: str,
+    cost: int,
+    details: dict | None = None,
+) -> Job:
+    """
+    Reserve credits and create a queued job with its "created" event.
+
+    The deduction, job, event and anything else the caller has pending in
+    the session (e.g. a new asset) are written in one transaction with a
+    single commit. The job ID is assigned up front so the event doesn't
+    need a flush to reference it.
+
+    Raises:
+        ValueError if insufficient credits (nothing is committed)
+    """
+    deduct_credits(db, user_id, cost)
+
+    job = Job(
+        id=generate_uuid(),
+        asset_id=asset_id,
+        user_id=user_id,
+        prompt=prompt,
+        status=JobStatus.queued,
+        credits_used=cost,
+    )
+    db.add(job)
+    db.add(JobEvent(job_id=job.id, event_type="created", details=details))
+    db.commit()
+
+    return job
 
 
 def refund_credits(
     db: Session, user_id: str, amount: int, job_id: str | None = None
-) -> Credit:
+) -> int:
     """
     Refund credits to user's balance.
     Should be called when a job fails.
@@ -72,30 +146,35 @@ def refund_credits(
         job_id: Optional job ID for audit trail
 
     Returns:
-        Updated credit record
+        New balance
     """
-    credit = get_or_create_credit(db, user_id)
-    balance = cast(int, credit.balance)
-    credit.balance = balance + amount  # type: ignore[assignment]
-    db.flush()
+    increment = (
+        update(Credit)
+        .where(Credit.user_id == user_id)
+        .values(balance=Credit.balance + amount)
+        .returning(Credit.balance)
+    )
+    new_balance = db.execute(increment).scalar()
+
+    if new_balance is None:
+        # No credit row yet; create it and apply the refund to that
+        get_or_create_credit(db, user_id)
+        new_balance = db.execute(increment).scalar_one()
 
     # Add audit event if job_id provided
     if job_id:
         event = JobEvent(
             job_id=job_id,
             event_type="credits_refunded",
-            details=json.dumps(
-                {
-                    "credits_refunded": amount,
-                    "new_balance": credit.balance,
-                    "reason": "job_failed",
-                }
-            ),
+            details={
+                "credits_refunded": amount,
+                "new_balance": new_balance,
+                "reason": "job_failed",
+            },
         )
         db.add(event)
-        db.flush()
 
-    return credit
+    return new_balance
 
 
 def refund_job(db: Session, job: Job) -> tuple[bool, str]:
@@ -113,21 +192,86 @@ def refund_job(db: Session, job: Job) -> tuple[bool, str]:
     if job.status != JobStatus.failed:
         return False, f"Job is not in failed state (current: {job.status.value})"
 
-    # Check if already refunded by looking at job events
-    existing_refund = (
-        db.query(JobEvent)
-        .filter(JobEvent.job_id == job.id, JobEvent.event_type == "credits_refunded")
-        .first()
-    )
-    if existing_refund:
-        return False, "Credits already refunded for this job"
-
     # Check if there are credits to refund
     if not job.credits_used or job.credits_used <= 0:
         return False, "No credits to refund"
 
-    # Perform refund
-    credit = refund_credits(db, job.user_id, job.credits_used, job.id)
+    # Perform refund. The unique refund-event index rejects a second refund
+    # for the same job, so there's no separate "already refunded?" query and
+    # concurrent refunds can't both succeed.
+    try:
+        with db.begin_nested():
+            new_balance = refund_credits(db, job.user_id, job.credits_used, job.id)
+    except IntegrityError:
+        return False, "Credits already refunded for this job"
     db.commit()
 
-    return True, f"Refunded {job.credits_used} credits (new balance: {credit.balance})"
+    return True, f"Refunded {job.credits_used} credits (new balance: {new_balance})"
+
+
+def insert_job_events(db: Session, events: list[dict]) -> None:
+    """
+    Insert JobEvent rows in batched multi-row INSERTs.
+
+    Each dict holds JobEvent column values (job_id, event_type, details);
+    id and created_at get their column defaults.
+    """
+    for start in range(0, len(events), EVENT_INSERT_CHUNK_SIZE):
+        db.execute(insert(JobEvent), events[start : start + EVENT_INSERT_CHUNK_SIZE])
+
+
+def refund_jobs_bulk(
+    db: Session, jobs: Iterable[Job], reason: str = "job_failed"
+) -> dict[str, int]:
+    """
+    Refund credits for many jobs at once.
+
+    Issues one UPDATE per user plus batched event INSERTs, instead of a
+    credit read/write and an event flush per job. Callers are responsible
+    for only passing jobs that should be refunded; nothing is committed.
+
+    Args:
+        db: Database session
+        jobs: Jobs to refund
+        reason: Recorded on each credits_refunded event
+
+    Returns:
+        Credits refunded per job ID; jobs whose user has no credit record
+        are left out and get no refund event
+    """
+    jobs = [job for job in jobs if job.credits_used and job.credits_used > 0]
+
+    totals: dict[str, int] = defaultdict(int)
+    for job in jobs:
+        totals[job.user_id] += job.credits_used
+
+    # Balance after all of a user's refunds in this batch
+    balances: dict[str, int] = {}
+    for user_id, amount in totals.items():
+        new_balance = db.execute(
+            update(Credit)
+            .where(Credit.user_id == user_id)
+            .values(balance=Credit.balance + amount)
+            .returning(Credit.balance)
+        ).scalar()
+        if new_balance is not None:
+            balances[user_id] = new_balance
+
+    refunded_jobs = [job for job in jobs if job.user_id in balances]
+    insert_job_events(
+        db,
+        [
+            {
+                "job_id": job.id,
+                "event_type": "credits_refunded",
+                "details": {
+                    "credits_refunded": job.credits_used,
+                    "new_balance": balances[job.user_id],
+                    "reason": reason,
+                },
+            }
+            for job in refunded_jobs
+        ],
+    )
+
+    return {job.id: job.credits_used for job in refunded_jobs}
@@ -2,12 +2,23 @@ import enum
 import os
 import uuid
 from collections.abc import Generator
-from datetime import datetime
 from dotenv import load_dotenv
 from sqlalchemy import Column, DateTime
 from sqlalchemy import Enum as SQLEnum
-from sqlalchemy import ForeignKey, Integer, String, Text, create_engine
+from sqlalchemy import (
+    JSON,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    Text,
+    create_engine,
+    text,
+)
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.compiler import compiles
 from sqlalchemy.orm import DeclarativeBase, Session, relationship, sessionmaker
+from sqlalchemy.sql.expression import FunctionElement
 
 load_dotenv()
 
@@ -23,7 +34,29 @@ else:
 # Strip any whitespace that might have been accidentally added
 DATABASE_URL = DATABASE_URL.strip() if DATABASE_URL else None
 
-engine = create_engine(DATABASE_URL)  # type: ignore[arg-type]
+# Compiled SQL cache; the default (500) is small for the number of distinct
+# admin/API statements, and misses recompile the SQL on every request
+DB_QUERY_CACHE_SIZE = int(os.getenv("DB_QUERY_CACHE_SIZE", "1200"))
+
+# Connection pool; sized for concurrent API requests and pre-pinged so a DB
+# restart doesn't surface as an error on the first query after it
+if DATABASE_URL.startswith("sqlite"):
+    # SQLite (tests/local dev) keeps SQLAlchemy's default file/memory pools
+    pool_options = {}
+else:
+    pool_options = {
+        "pool_size": int(os.getenv("DB_POOL_SIZE", "20")),
+        "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", "40")),
+        "pool_timeout": int(os.getenv("DB_POOL_TIMEOUT", "30")),
+        "pool_recycle": int(os.getenv("DB_POOL_RECYCLE", "1800")),
+        "pool_pre_ping": True,
+    }
+
+engine = create_engine(
+    DATABASE_URL,  # type: ignore[arg-type]
+    query_cache_size=DB_QUERY_CACHE_SIZE,
+    **pool_options,
+)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 
@@ -44,6 +77,29 @@ def generate_uuid() -> str:
     return str(uuid.uuid4())
 
 
+class utcnow(FunctionElement):
+    """
+    Current UTC time, evaluated by the database.
+
+    Columns are naive UTC timestamps; plain now() would follow the
+    Postgres session time zone.
+    """
+
+    type = DateTime()
+    inherit_cache = True
+
+
+@compiles(utcnow, "postgresql")
+def _pg_utcnow(element, compiler, **kw) -> str:
+    return "TIMEZONE('utc', CURRENT_TIMESTAMP)"
+
+
+@compiles(utcnow)
+def _default_utcnow(element, compiler, **kw) -> str:
+    # SQLite's CURRENT_TIMESTAMP is already UTC
+    return "CURRENT_TIMESTAMP"
+
+
 class JobStatus(enum.Enum):
     queued = "queued"
     processing = "processing"
@@ -56,8 +112,8 @@ class User(Base):
 
     id = Column(UUIDType, primary_key=True, default=generate_uuid)
     email = Column(String(255), unique=True, nullable=False)
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = Column(DateTime, server_default=utcnow())
+    updated_at = Column(DateTime, server_default=utcnow(), onupdate=utcnow())
 
     shoots = relationship("Shoot", back_populates="user")
     assets = relationship("Asset", back_populates="user")
@@ -71,8 +127,8 @@ class Credit(Base):
     id = Column(UUIDType, primary_key=True, default=generate_uuid)
     user_id = Column(UUIDType, ForeignKey("users.id"), nullable=False, unique=True)
     balance = Column(Integer, nullable=False, default=0)
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = Column(DateTime, server_default=utcnow())
+    updated_at = Column(DateTime, server_default=utcnow(), onupdate=utcnow())
 
     user = relationship("User", back_populates="credits")
 
@@ -83,12 +139,18 @@ class Shoot(Base):
     id = Column(UUIDType, primary_key=True, default=generate_uuid)
     user_id = Column(UUIDType, ForeignKey("users.id"), nullable=False)
     name = Column(String(255), nullable=False)
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = Column(DateTime, server_default=utcnow())
+    updated_at = Column(DateTime, server_default=utcnow(), onupdate=utcnow())
 
     user = relationship("User", back_populates="shoots")
     assets = relationship("Asset", back_populates="shoot")
 
+    __table_args__ = (
+        # Project names are unique per user; new projects rely on this
+        # to detect a clash instead of counting similar names first
+        Index("idx_shoots_user_id_name", "user_id", "name", unique=True),
+    )
+
 
 class Asset(Base):
     __tablename__ = "assets"
@@ -100,8 +162,8 @@ class Asset(Base):
     file_path = Column(String(512), nullable=False)
     file_size = Column(Integer, nullable=False)
     mime_type = Column(String(100), nullable=False)
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = Column(DateTime, server_default=utcnow())
+    updated_at = Column(DateTime, server_default=utcnow(), onupdate=utcnow())
 
     shoot = relationship("Shoot", back_populates="assets")
     user = relationship("User", back_populates="assets")
@@ -119,8 +181,8 @@ class Job(Base):
     output_path = Column(String(512))
     error_message = Column(Text)
     credits_used = Column(Integer, default=2)
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = Column(DateTime, server_default=utcnow())
+    updated_at = Column(DateTime, server_default=utcnow(), onupdate=utcnow())
     started_at = Column(DateTime)
     completed_at = Column(DateTime)
     # Lease-based locking to prevent stuck jobs
@@ -139,11 +201,23 @@ class JobEvent(Base):
     id = Column(UUIDType, primary_key=True, default=generate_uuid)
     job_id = Column(UUIDType, ForeignKey("jobs.id"), nullable=False)
     event_type = Column(String(50), nullable=False)
-    details = Column(Text)  # JSON as text for simplicity
-    created_at = Column(DateTime, default=datetime.utcnow)
+    details = Column(JSON().with_variant(JSONB(), "postgresql"))
+    created_at = Column(DateTime, server_default=utcnow())
 
     job = relationship("Job", back_populates="events")
 
+    __table_args__ = (
+        # At most one refund per job; refund_job relies on this instead of
+        # checking for an existing refund first
+        Index(
+            "idx_job_events_one_refund",
+            "job_id",
+            unique=True,
+            postgresql_where=text("event_type = 'credits_refunded'"),
+            sqlite_where=text("event_type = 'credits_refunded'"),
+        ),
+    )
+
 
 def get_db() -> Generator[Session, None, None]:
     """Dependency that provides a database session"""
@@ -4,9 +4,13 @@ Structured logging setup using structlog
 
 import logging
 import os
+import re
+import secrets
 import sys
+import time
 from typing import Any, MutableMapping
 
+import orjson
 import structlog
 from structlog.typing import WrappedLogger
 
@@ -14,6 +18,10 @@ from structlog.typing import WrappedLogger
 def setup_logging() -> WrappedLogger:
     """Configure structured logging for the application"""
 
+    # Configure once per process; a repeat import or call reuses the setup
+    if structlog.is_configured():
+        return structlog.get_logger()
+
     log_level = os.getenv("LOG_LEVEL", "INFO").upper()
     environment = os.getenv("ENVIRONMENT", "development")
 
@@ -24,13 +32,17 @@ def setup_logging() -> WrappedLogger:
         level=getattr(logging, log_level),
     )
 
-    # Add environment and service info
+    # Add environment and service info; fixed for the process, so resolved once
+    service_context = {
+        "service": "luster-api",
+        "environment": environment,
+        "version": os.getenv("APP_VERSION", "1.0.0"),
+    }
+
     def add_service_context(
         logger: WrappedLogger, method_name: str, event_dict: MutableMapping[str, Any]
     ) -> MutableMapping[str, Any]:
-        event_dict["service"] = "luster-api"
-        event_dict["environment"] = environment
-        event_dict["version"] = os.getenv("APP_VERSION", "1.0.0")
+        event_dict.update(service_context)
         return event_dict
 
     # Configure structlog processors
@@ -45,9 +57,12 @@ def setup_logging() -> WrappedLogger:
 
     # Use JSON formatter in production, pretty formatter in development
     if environment == "production":
-        processors.append(structlog.processors.JSONRenderer())
+        # orjson renders straight to bytes, written to stdout without re-encoding
+        processors.append(structlog.processors.JSONRenderer(serializer=orjson.dumps))
+        logger_factory: Any = structlog.BytesLoggerFactory()
     else:
         processors.append(structlog.dev.ConsoleRenderer(colors=True))
+        logger_factory = structlog.WriteLoggerFactory()
 
     # Configure structlog
     structlog.configure(
@@ -55,7 +70,7 @@ def setup_logging() -> WrappedLogger:
         wrapper_class=structlog.make_filtering_bound_logger(
             getattr(logging, log_level)
         ),
-        logger_factory=structlog.WriteLoggerFactory(),
+        logger_factory=logger_factory,
         cache_logger_on_first_use=True,
     )
 
@@ -188,6 +203,11 @@ def log_health_check(status: str, services: dict[str, Any]) -> None:
     )
 
 
+# Incoming X-Request-ID values are logged and echoed back, so only plain
+# tokens are accepted (no control characters, quotes or newlines)
+REQUEST_ID_PATTERN = re.compile(rb"[A-Za-z0-9._-]{1,64}")
+
+
 # Middleware for request logging
 class LoggingMiddleware:
     """FastAPI middleware for structured request/response logging"""
@@ -200,10 +220,15 @@ class LoggingMiddleware:
             await self.app(scope, receive, send)
             return
 
-        import time
-        import uuid
-
-        request_id = str(uuid.uuid4())
+        # Correlation ID only; reuse the proxy's X-Request-ID when it sends one
+        request_id = next(
+            (
+                value.decode("ascii")
+                for name, value in scope["headers"]
+                if name == b"x-request-id" and REQUEST_ID_PATTERN.fullmatch(value)
+            ),
+            None,
+        ) or secrets.token_hex(8)
         start_time = time.time()
 
         # Add request ID to context
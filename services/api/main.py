@@ -1,40 +1,64 @@
+import asyncio
 import base64
+import binascii
+import functools
 import json
 import os
+import re
+import shutil
+import time
 import uuid
+from contextlib import asynccontextmanager
 from datetime import datetime
 from pathlib import Path
 from typing import Optional
 
 import sentry_sdk
+from anyio import to_thread
 from dotenv import load_dotenv
-from fastapi import Depends, FastAPI, File, Form, HTTPException, Request, UploadFile
+from fastapi import (
+    Depends,
+    FastAPI,
+    File,
+    Form,
+    HTTPException,
+    Request,
+    Response,
+    UploadFile,
+)
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import FileResponse
-from PIL import Image
-from pillow_heif import register_heif_opener
 from pydantic import BaseModel, field_validator
 from sentry_sdk.integrations.fastapi import FastApiIntegration
 from sentry_sdk.integrations.sqlalchemy import SqlalchemyIntegration
-from sqlalchemy import text
-from sqlalchemy.orm import Session
-
-# Register HEIF opener so PIL can handle HEIC files
-register_heif_opener()
+from sqlalchemy import func, text
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, selectinload
 
 from slowapi.errors import RateLimitExceeded
 
 from admin import router as admin_router
-from auth import get_current_user, get_optional_user
+from auth import close_http_client, get_current_user, get_optional_user
 from auth_endpoints import router as auth_router
-from database import Asset, Credit, Job, JobEvent, JobStatus, Shoot, User, get_db
+from credit_service import create_job_atomic
+from database import (
+    Asset,
+    Credit,
+    Job,
+    JobEvent,
+    JobStatus,
+    Shoot,
+    User,
+    engine,
+    get_db,
+)
 from logger import LoggingMiddleware, logger
 from rate_limiter import RATE_LIMITS, limiter, rate_limit_exceeded_handler
 from revenue_cat import router as revenuecat_router
 from schemas import validate_uuid
 
 # Prompt loader — single source of truth
-from prompt_loader import build_prompt, get_available_styles
+from prompt_loader import build_prompt, get_available_styles, warmup as warm_prompts
 
 # Import R2 client for presigned URLs
 try:
@@ -50,6 +74,19 @@ load_dotenv()
 
 # Initialize Sentry
 sentry_dsn = os.getenv("SENTRY_DSN")
+SENTRY_TRACES_SAMPLE_RATE = float(os.getenv("SENTRY_TRACES_SAMPLE_RATE", "0.25"))
+# Probe endpoints make up most request volume and aren't worth tracing
+SENTRY_UNTRACED_PATHS = frozenset({"/health", "/live", "/ready", "/metrics"})
+
+
+def _traces_sampler(sampling_context: dict) -> float:
+    """Skip tracing for probe endpoints; sample everything else at the configured rate."""
+    path = sampling_context.get("asgi_scope", {}).get("path")
+    if path in SENTRY_UNTRACED_PATHS:
+        return 0.0
+    return SENTRY_TRACES_SAMPLE_RATE
+
+
 if sentry_dsn:
     sentry_sdk.init(
         dsn=sentry_dsn,
@@ -58,20 +95,40 @@ if sentry_dsn:
             SqlalchemyIntegration(),
         ],
         # Adjust sampling rate based on environment
-        traces_sample_rate=float(os.getenv("SENTRY_TRACES_SAMPLE_RATE", "0.25")),
+        traces_sampler=_traces_sampler,
         environment=os.getenv("ENVIRONMENT", "development"),
         release=os.getenv("APP_VERSION", "1.0.0"),
         # Additional performance monitoring configuration
         profiles_sample_rate=0.1,  # Profile 10% of transactions
         send_default_pii=False,  # Don't send personally identifiable information
+        max_breadcrumbs=20,  # Default is 100; fewer per-request allocations
     )
-    logger.info(
-        f"Sentry initialized with {os.getenv('SENTRY_TRACES_SAMPLE_RATE', '0.25')} trace sampling"
-    )
+    logger.info(f"Sentry initialized with {SENTRY_TRACES_SAMPLE_RATE} trace sampling")
 else:
     logger.warning("SENTRY_DSN not set, Sentry not initialized")
 
-app = FastAPI(title="Luster AI API", version="1.0.0")
+
+# Sync endpoints, sync dependencies (get_db) and the auth user lookup run on
+# anyio's threadpool, 40 threads by default; size it to the DB pool
+# (DB_POOL_SIZE + DB_MAX_OVERFLOW) so requests wait on connections, not
+# threads. The async upload handlers still query the DB on the event loop.
+THREADPOOL_SIZE = int(os.getenv("THREADPOOL_SIZE", "60"))
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    to_thread.current_default_thread_limiter().total_tokens = THREADPOOL_SIZE
+
+    # Load prompt files now so the first job request doesn't read from disk
+    try:
+        warm_prompts()
+    except OSError as e:
+        logger.error(f"Failed to preload prompts: {e}")
+    yield
+    await close_http_client()
+
+
+app = FastAPI(title="Luster AI API", version="1.0.0", lifespan=lifespan)
 
 # Add rate limiting
 app.state.limiter = limiter
@@ -117,6 +174,74 @@ def validate_path_uuid(value: str, param_name: str = "id") -> str:
         )
 
 
+# Base64 characters decoded per step when writing uploads to disk (multiple of 4)
+BASE64_DECODE_CHUNK_CHARS = 1 << 20
+# Anything outside the base64 alphabet, dropped like b64decode does by default
+NON_BASE64_CHARS = re.compile(r"[^A-Za-z0-9+/=]")
+
+
+def decode_base64_to_file(data: str, output_path: str) -> int:
+    """
+    Decode base64 text straight to a file, one chunk at a time.
+
+    Only one chunk of decoded bytes is held at once, instead of the full
+    decoded image alongside the encoded string.
+
+    Args:
+        data: Base64 encoded data (non-alphabet characters are ignored)
+        output_path: Path to write the decoded bytes to
+
+    Returns:
+        Number of bytes written
+
+    Raises:
+        binascii.Error: If data is not valid base64
+    """
+    size = 0
+    pending = ""
+    with open(output_path, "wb") as f:
+        for start in range(0, len(data), BASE64_DECODE_CHUNK_CHARS):
+            chunk = pending + NON_BASE64_CHARS.sub(
+                "", data[start : start + BASE64_DECODE_CHUNK_CHARS]
+            )
+            # Carry a partial 4-char group over to the next chunk
+            usable = len(chunk) - len(chunk) % 4
+            pending = chunk[usable:]
+            size += f.write(base64.b64decode(chunk[:usable]))
+        if pending:
+            raise binascii.Error("Incorrect padding")
+    return size
+
+
+# Bytes copied per step when saving multipart uploads to disk
+UPLOAD_COPY_CHUNK_BYTES = 1 << 20
+
+
+def save_upload_to_file(upload: UploadFile, output_path: str) -> int:
+    """
+    Copy an uploaded file to disk one chunk at a time.
+
+    Starlette has already spooled the body to a temporary file, so this
+    avoids reading the whole upload into memory just to write it out again.
+    Blocking; run it in a thread from async handlers.
+
+    Returns:
+        Number of bytes written
+    """
+    upload.file.seek(0)
+    with open(output_path, "wb") as f:
+        shutil.copyfileobj(upload.file, f, UPLOAD_COPY_CHUNK_BYTES)
+        return f.tell()
+
+
+@functools.lru_cache(maxsize=1)
+def _ensure_heif() -> None:
+    """Register the HEIF opener so PIL can handle HEIC files (once)."""
+    from pillow_heif import register_heif_opener
+
+    register_heif_opener()
+
+
 def convert_to_jpg(input_path: str, output_path: str, quality: int = 95) -> None:
     """
     Convert any image format (including HEIC) to JPG.
@@ -126,27 +251,34 @@ def convert_to_jpg(input_path: str, output_path: str, quality: int = 95) -> None
         output_path: Path where JPG should be saved
         quality: JPG quality (1-100, default 95)
     """
+    # PIL and pillow_heif are only loaded by processes that convert images
+    from PIL import Image
+
+    _ensure_heif()
+
     try:
         # Open image (PIL will use HEIF opener for HEIC files)
         with Image.open(input_path) as img:
             # Convert to RGB if needed (RGBA, P, etc.)
-            if img.mode in ("RGBA", "LA", "P"):
-                # Create white background for transparency
-                background = Image.new("RGB", img.size, (255, 255, 255))
-                if img.mode == "P":
-                    img = img.convert("RGBA")
-                background.paste(
-                    img, mask=img.split()[-1] if img.mode in ("RGBA", "LA") else None
-                )
-                img = background
+            if img.mode == "P":
+                img = img.convert("RGBA")
+            if img.mode in ("RGBA", "LA"):
+                if img.getchannel("A").getextrema() == (255, 255):
+                    # Fully opaque, nothing to flatten
+                    img = img.convert("RGB")
+                else:
+                    # Flatten transparency onto a white background
+                    background = Image.new("RGBA", img.size, (255, 255, 255, 255))
+                    img = Image.alpha_composite(background, img.convert("RGBA"))
+                    img = img.convert("RGB")
             elif img.mode != "RGB":
                 img = img.convert("RGB")
 
             # Save as JPG
             img.save(output_path, "JPEG", quality=quality, optimize=True)
-            print(f"Converted {input_path} to JPG: {output_path}")
+        logger.debug("Converted image to JPG", src=input_path, dst=output_path)
     except Exception as e:
-        print(f"Error converting image: {e}")
+        logger.exception("Error converting image", src=input_path)
         raise HTTPException(
             status_code=400, detail=f"Failed to process image: {str(e)}"
         )
@@ -185,21 +317,45 @@ class Base64ImageRequest(BaseModel):
         return v
 
 
+# Platform probes poll /health; reuse the DB check briefly so probe storms
+# don't each take a pooled connection
+HEALTH_DB_CACHE_TTL_SECONDS = 2
+_db_health: tuple[float, str] | None = None
+
+
+def _database_health() -> str:
+    global _db_health
+
+    now = time.monotonic()
+    if _db_health is not None and now - _db_health[0] < HEALTH_DB_CACHE_TTL_SECONDS:
+        return _db_health[1]
+
+    try:
+        # Bare pooled connection; no Session or ORM transaction needed
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+        status = "healthy"
+    except Exception as e:
+        status = f"unhealthy: {str(e)}"
+
+    _db_health = (now, status)
+    return status
+
+
+@app.get("/live")
+def liveness_check():
+    """Liveness probe; in-process only, never touches the database"""
+    return {"status": "alive"}
+
+
 @app.get("/health")
 def health_check():
     """Health check endpoint with database status"""
     health_status = {"status": "healthy", "services": {}}
 
     # Check database
-    try:
-        from database import SessionLocal
-
-        db = SessionLocal()
-        db.execute(text("SELECT 1"))
-        db.close()
-        health_status["services"]["database"] = "healthy"
-    except Exception as e:
-        health_status["services"]["database"] = f"unhealthy: {str(e)}"
+    health_status["services"]["database"] = _database_health()
+    if health_status["services"]["database"] != "healthy":
         health_status["status"] = "degraded"
 
     # Check R2 storage
@@ -212,6 +368,11 @@ def health_check():
 # R2 Presigned URL Endpoints
 # ============================================================================
 
+# Limits shared by the upload request schemas
+DEFAULT_UPLOAD_SIZE_BYTES = 10 * 1024 * 1024  # 10MB
+MAX_UPLOAD_SIZE_BYTES = 50 * 1024 * 1024  # 50MB
+MAX_FILENAME_LENGTH = 255
+
 
 class PresignedUploadRequest(BaseModel):
     """Request schema for presigned upload URL with validation."""
@@ -219,7 +380,7 @@ class PresignedUploadRequest(BaseModel):
     shoot_id: str
     filename: str
     content_type: str = "image/jpeg"
-    max_file_size: int = 10 * 1024 * 1024  # 10MB default
+    max_file_size: int = DEFAULT_UPLOAD_SIZE_BYTES
 
     @field_validator("shoot_id")
     @classmethod
@@ -231,7 +392,7 @@ class PresignedUploadRequest(BaseModel):
     def validate_filename(cls, v: str) -> str:
         if not v or not v.strip():
             raise ValueError("Filename cannot be empty")
-        if len(v) > 255:
+        if len(v) > MAX_FILENAME_LENGTH:
             raise ValueError("Filename too long (max 255 characters)")
         return v.strip()
 
@@ -240,7 +401,7 @@ class PresignedUploadRequest(BaseModel):
     def validate_max_file_size(cls, v: int) -> int:
         if v < 1:
             raise ValueError("File size must be positive")
-        if v > 50 * 1024 * 1024:  # 50MB max
+        if v > MAX_UPLOAD_SIZE_BYTES:
             raise ValueError("File size too large (max 50MB)")
         return v
 
@@ -325,7 +486,7 @@ class ConfirmUploadRequest(BaseModel):
     def validate_file_size(cls, v: int) -> int:
         if v < 1:
             raise ValueError("File size must be positive")
-        if v > 50 * 1024 * 1024:
+        if v > MAX_UPLOAD_SIZE_BYTES:
             raise ValueError("File size too large (max 50MB)")
         return v
 
@@ -391,6 +552,45 @@ def confirm_upload(
     }
 
 
+def _add_shoot_if_name_free(db: Session, user_id: str, name: str) -> Shoot | None:
+    """Insert a shoot in a savepoint; None if the user already has that name."""
+    shoot = Shoot(id=str(uuid.uuid4()), user_id=user_id, name=name)
+    try:
+        with db.begin_nested():
+            db.add(shoot)
+    except IntegrityError:
+        return None
+    return shoot
+
+
+def create_shoot_with_unique_name(db: Session, user_id: str, name: str) -> Shoot:
+    """
+    Create a shoot, adding a suffix if the user already has one with this name.
+
+    The unique (user_id, name) index reports clashes, so the common case is a
+    single INSERT. Only on a clash are similar names counted to pick the
+    "Name (n)" suffix, with a random suffix as the last resort (e.g. when a
+    concurrent request took the numbered name).
+    """
+    shoot = _add_shoot_if_name_free(db, user_id, name)
+    if shoot is None:
+        existing_count = (
+            db.query(Shoot)
+            .filter(Shoot.user_id == user_id, Shoot.name.like(f"{name}%"))
+            .count()
+        )
+        shoot = _add_shoot_if_name_free(db, user_id, f"{name} ({existing_count + 1})")
+    if shoot is None:
+        shoot = Shoot(
+            id=str(uuid.uuid4()),
+            user_id=user_id,
+            name=f"{name} ({uuid.uuid4().hex[:4]})",
+        )
+        db.add(shoot)
+        db.flush()
+    return shoot
+
+
 @app.get("/shoots")
 def list_shoots(
     db: Session = Depends(get_db),
@@ -398,13 +598,36 @@ def list_shoots(
 ):
     """List all shoots for the user with job status aggregation"""
 
-    # Query all shoots for the user with related assets and jobs
-    shoots = db.query(Shoot).filter(Shoot.user_id == user.id).all()
+    # Most recently updated first
+    shoots = (
+        db.query(Shoot)
+        .filter(Shoot.user_id == user.id)
+        .order_by(Shoot.updated_at.desc())
+        .all()
+    )
+
+    # Count assets and jobs per status in the database rather than loading
+    # every asset and job row
+    asset_counts = dict(
+        db.query(Asset.shoot_id, func.count(Asset.id))
+        .filter(Asset.user_id == user.id)
+        .group_by(Asset.shoot_id)
+        .all()
+    )
+    status_counts: dict[str, dict[str, int]] = {}
+    for shoot_id, status, count in (
+        db.query(Asset.shoot_id, Job.status, func.count(Job.id))
+        .join(Job, Job.asset_id == Asset.id)
+        .filter(Asset.user_id == user.id)
+        .group_by(Asset.shoot_id, Job.status)
+        .all()
+    ):
+        status_counts.setdefault(shoot_id, {})[status.value] = count
 
     result = []
     for shoot in shoots:
         # Count total assets
-        asset_count = len(shoot.assets)
+        asset_count = asset_counts.get(shoot.id, 0)
 
         # Aggregate job statuses across all assets
         job_statuses = {
@@ -413,10 +636,7 @@ def list_shoots(
             "succeeded": 0,
             "failed": 0,
         }
-
-        for asset in shoot.assets:
-            for job in asset.jobs:
-                job_statuses[job.status.value] += 1
+        job_statuses.update(status_counts.get(shoot.id, {}))
 
         # Determine overall project status
         if job_statuses["queued"] > 0 or job_statuses["processing"] > 0:
@@ -440,9 +660,6 @@ def list_shoots(
             }
         )
 
-    # Sort by updated_at descending (most recent first)
-    result.sort(key=lambda x: x["updated_at"], reverse=True)
-
     return {"shoots": result}
 
 
@@ -460,8 +677,8 @@ def create_shoot(
             status_code=422, detail="Name cannot be empty or whitespace"
         )
 
-    shoot = Shoot(user_id=user.id, name=name)
-    db.add(shoot)
+    # Names are often auto-generated ("<style> - <date>"); suffix repeats
+    shoot = create_shoot_with_unique_name(db, user.id, name)
     db.commit()
     db.refresh(shoot)
     return {"id": str(shoot.id), "name": shoot.name}
@@ -496,22 +713,15 @@ async def upload_file(
 
     print(f"Saving to: {file_path}")
 
-    # Read the file content
-    file_content = await file.read()
-    print(f"File content size: {len(file_content)} bytes")
+    # Save file
+    file_size = await asyncio.to_thread(save_upload_to_file, file, file_path)
+    print(f"File saved, size on disk: {file_size} bytes")
 
-    if len(file_content) == 0:
+    if file_size == 0:
         print("ERROR: File content is empty!")
+        os.remove(file_path)
         raise HTTPException(status_code=400, detail="Uploaded file is empty")
 
-    # Save file
-    with open(file_path, "wb") as buffer:
-        buffer.write(file_content)
-
-    # Get file size
-    file_size = os.path.getsize(file_path)
-    print(f"File saved, size on disk: {file_size} bytes")
-
     # Create asset record
     asset = Asset(
         shoot_id=shoot_id,
@@ -553,48 +763,26 @@ def create_job(
     if not asset:
         raise HTTPException(status_code=404, detail="Asset not found")
 
-    # Check user credits
-    credit = db.query(Credit).filter(Credit.user_id == user.id).first()
-    if not credit or credit.balance < 1:
-        raise HTTPException(status_code=402, detail="Insufficient credits")
-
     # Set credits based on tier
     credits_used = 1 if tier == "free" else 2  # Premium tier costs more
 
-    # Check sufficient balance for the tier
-    if credit.balance < credits_used:
-        raise HTTPException(status_code=402, detail="Insufficient credits")
-
-    # Deduct credits upfront (reservation) - will be refunded on failure
-    credit.balance -= credits_used
-    db.flush()
-
     # Build merged prompt from style key (default + style)
     merged_prompt = build_prompt(prompt)
     logger.info(f"📝 [/jobs] style_key={prompt!r} → merged prompt ({len(merged_prompt)} chars):\n{merged_prompt[:500]}...")
 
-    # Create job in database
-    job = Job(
-        asset_id=asset_id,
-        user_id=user.id,
-        prompt=merged_prompt,
-        status=JobStatus.queued,
-        credits_used=credits_used,
-    )
-    db.add(job)
-    db.flush()  # Get job ID
-
-    # Create job event
-    event = JobEvent(
-        job_id=job.id,
-        event_type="created",
-        details=json.dumps(
-            {"style": prompt, "tier": tier, "credits_used": credits_used}
-        ),
-    )
-    db.add(event)
-    db.commit()
-    db.refresh(job)
+    # Deduct credits upfront (reservation) and create the job in one
+    # transaction - credits will be refunded on failure
+    try:
+        job = create_job_atomic(
+            db,
+            user.id,
+            asset_id,
+            merged_prompt,
+            credits_used,
+            details={"style": prompt, "tier": tier, "credits_used": credits_used},
+        )
+    except ValueError:
+        raise HTTPException(status_code=402, detail="Insufficient credits")
 
     # Enqueue job for processing
     try:
@@ -699,7 +887,7 @@ def get_job(
         if R2_ENABLED:
             try:
                 # Get asset for filename
-                asset = db.query(Asset).filter(Asset.id == job.asset_id).first()
+                asset = db.get(Asset, job.asset_id)
                 filename = (
                     f"enhanced_{asset.original_filename}" if asset else "enhanced.jpg"
                 )
@@ -779,7 +967,12 @@ def get_shoot_assets(
     if not shoot:
         raise HTTPException(status_code=404, detail="Shoot not found")
 
-    assets = db.query(Asset).filter(Asset.shoot_id == shoot_id).all()
+    assets = (
+        db.query(Asset)
+        .options(selectinload(Asset.jobs))
+        .filter(Asset.shoot_id == shoot_id)
+        .all()
+    )
 
     asset_list = []
     for asset in assets:
@@ -874,7 +1067,7 @@ def serve_output(filename: str, db: Session = Depends(get_db)):
     job_id = filename.replace(".jpg", "").replace(".jpeg", "").replace(".png", "")
     logger.info(f"Extracted job_id: {job_id}")
 
-    job = db.query(Job).filter(Job.id == job_id).first()
+    job = db.get(Job, job_id)
     if not job:
         logger.error(f"Job not found: {job_id}")
         raise HTTPException(status_code=404, detail="Job not found")
@@ -998,38 +1191,11 @@ async def mobile_enhance(
             # Auto-generate name: "Project Dec 11"
             name = f"Project {datetime.now().strftime('%b %d')}"
 
-        # Check for duplicate names and add suffix if needed
-        existing_count = (
-            db.query(Shoot)
-            .filter(Shoot.user_id == user.id, Shoot.name.like(f"{name}%"))
-            .count()
-        )
-
-        if existing_count > 0:
-            name = f"{name} ({existing_count + 1})"
-
-        mobile_shoot = Shoot(id=str(uuid.uuid4()), user_id=user.id, name=name)
-        db.add(mobile_shoot)
-        db.flush()
+        # Add a suffix if the name is already taken
+        mobile_shoot = create_shoot_with_unique_name(db, user.id, name)
         print(f"Created new project: {mobile_shoot.name} ({mobile_shoot.id})")
 
-    # Save uploaded file
-    file_content = await image.read()
-    print(f"File content size: {len(file_content)} bytes")
-
-    if len(file_content) == 0:
-        raise HTTPException(status_code=400, detail="Uploaded file is empty")
-
-    # Generate unique filename with mobile prefix
     file_ext = os.path.splitext(image.filename)[1] if image.filename else ".jpg"
-    unique_filename = f"mobile_{uuid.uuid4()}{file_ext}"
-    file_path = os.path.join(UPLOADS_DIR, unique_filename)
-
-    # Save file temporarily
-    with open(file_path, "wb") as buffer:
-        buffer.write(file_content)
-
-    print(f"File saved temporarily: {file_path}")
 
     # Check if file needs conversion (HEIC or other formats)
     # Check both file extension and content-type header
@@ -1040,40 +1206,73 @@ async def mobile_enhance(
         or (image.content_type and "heif" in image.content_type.lower())
     )
 
-    if is_heic:
-        # Always save as .jpg for processing
-        jpg_filename = f"mobile_{uuid.uuid4()}.jpg"
-        jpg_path = os.path.join(UPLOADS_DIR, jpg_filename)
-
-        print(
-            f"Converting HEIC/HEIF (content-type: {image.content_type}, ext: {file_ext}) to JPG..."
-        )
-        convert_to_jpg(file_path, jpg_path)
+    asset_id = str(uuid.uuid4())
 
-        # Remove original HEIC file
-        os.remove(file_path)
-        file_path = jpg_path
-        print(f"Converted to JPG: {jpg_path}")
+    if R2_ENABLED and not is_heic:
+        # Nothing to convert: stream the spooled upload straight to R2
+        # (API and Worker run in separate containers) without a local copy
+        image.file.seek(0, os.SEEK_END)
+        file_size = image.file.tell()
+        image.file.seek(0)
+        print(f"File content size: {file_size} bytes")
 
-    file_size = os.path.getsize(file_path)
-    print(f"Final file: {file_path}, size: {file_size} bytes")
+        if file_size == 0:
+            raise HTTPException(status_code=400, detail="Uploaded file is empty")
 
-    # Upload to R2 so worker can access it (API and Worker run in separate containers)
-    if R2_ENABLED:
-        asset_id = str(uuid.uuid4())
         r2_key = f"{user.id}/{mobile_shoot.id}/{asset_id}/original.jpg"
         print(f"Uploading to R2: {r2_key}")
-        r2_client.upload_file(
-            file_path=file_path, object_key=r2_key, content_type="image/jpeg"
+        await asyncio.to_thread(
+            r2_client.upload_fileobj, image.file, r2_key, "image/jpeg"
         )
-        # Clean up local file after R2 upload
-        os.remove(file_path)
         storage_path = r2_key  # Store R2 key, not local path
         print(f"Uploaded to R2: {r2_key}")
     else:
-        asset_id = str(uuid.uuid4())
-        storage_path = file_path  # Local path for development
-        print(f"R2 not enabled, using local path: {file_path}")
+        # Generate unique filename with mobile prefix
+        unique_filename = f"mobile_{uuid.uuid4()}{file_ext}"
+        file_path = os.path.join(UPLOADS_DIR, unique_filename)
+
+        # Save file temporarily
+        file_size = await asyncio.to_thread(save_upload_to_file, image, file_path)
+        print(f"File content size: {file_size} bytes")
+
+        if file_size == 0:
+            os.remove(file_path)
+            raise HTTPException(status_code=400, detail="Uploaded file is empty")
+
+        print(f"File saved temporarily: {file_path}")
+
+        if is_heic:
+            # Always save as .jpg for processing
+            jpg_filename = f"mobile_{uuid.uuid4()}.jpg"
+            jpg_path = os.path.join(UPLOADS_DIR, jpg_filename)
+
+            print(
+                f"Converting HEIC/HEIF (content-type: {image.content_type}, ext: {file_ext}) to JPG..."
+            )
+            await asyncio.to_thread(convert_to_jpg, file_path, jpg_path)
+
+            # Remove original HEIC file
+            os.remove(file_path)
+            file_path = jpg_path
+            print(f"Converted to JPG: {jpg_path}")
+            file_size = os.path.getsize(file_path)
+
+        print(f"Final file: {file_path}, size: {file_size} bytes")
+
+        # Upload to R2 so worker can access it (API and Worker run in separate containers)
+        if R2_ENABLED:
+            r2_key = f"{user.id}/{mobile_shoot.id}/{asset_id}/original.jpg"
+            print(f"Uploading to R2: {r2_key}")
+            r2_client.upload_file(
+                file_path=file_path, object_key=r2_key, content_type="image/jpeg"
+            )
+            # Clean up local file after R2 upload
+            os.remove(file_path)
+            storage_path = r2_key  # Store R2 key, not local path
+            print(f"Uploaded to R2: {r2_key}")
+        else:
+            storage_path = file_path  # Local path for development
+            print(f"R2 not enabled, using local path: {file_path}")
 
     # Create asset
     asset = Asset(
@@ -1086,57 +1285,24 @@ async def mobile_enhance(
         mime_type="image/jpeg",  # Always JPG after conversion
     )
     db.add(asset)
-    db.flush()
-
-    # Check or create credits with row-level lock to prevent race conditions
-    # Using FOR UPDATE ensures atomic read-check-modify operation
-    credit = (
-        db.query(Credit)
-        .filter(Credit.user_id == user.id)
-        .with_for_update()  # Lock the row to prevent concurrent modifications
-        .first()
-    )
-    if not credit:
-        credit = Credit(user_id=user.id, balance=0)
-        db.add(credit)
-        db.flush()
-        # Re-query with lock after creation
-        credit = (
-            db.query(Credit)
-            .filter(Credit.user_id == user.id)
-            .with_for_update()
-            .first()
-        )
-
-    if credit.balance < credit_cost:
-        raise HTTPException(status_code=402, detail="Insufficient credits")
-
-    # Deduct credits upfront (reservation) - will be refunded on failure
-    credit.balance -= credit_cost
-    db.flush()
 
     # Build merged prompt from style key (default + style)
     merged_prompt = build_prompt(style)
     logger.info(f"📝 [mobile/enhance] style_key={style!r} → merged prompt ({len(merged_prompt)} chars):\n{merged_prompt[:500]}...")
 
-    job = Job(
-        asset_id=asset.id,
-        user_id=user.id,
-        prompt=merged_prompt,
-        status=JobStatus.queued,
-        credits_used=credit_cost,
-    )
-    db.add(job)
-    db.flush()
-
-    # Create job event
-    event = JobEvent(
-        job_id=job.id,
-        event_type="created",
-        details=json.dumps({"source": "mobile", "style": style}),
-    )
-    db.add(event)
-    db.commit()
+    # Deduct credits upfront (reservation) and create the asset, job and job
+    # event in one transaction - credits will be refunded on failure
+    try:
+        job = create_job_atomic(
+            db,
+            user.id,
+            asset.id,
+            merged_prompt,
+            credit_cost,
+            details={"source": "mobile", "style": style},
+        )
+    except ValueError:
+        raise HTTPException(status_code=402, detail="Insufficient credits")
 
     print(f"Job created: {job.id}")
 
@@ -1163,11 +1329,18 @@ async def mobile_enhance_base64(
     print(f"Image data length: {len(body.image)} chars")
     print(f"User: {user.id}")
 
-    # Decode base64 image
+    # Decode base64 image straight to a temporary file
+    temp_filename = f"mobile_{uuid.uuid4()}_temp"
+    temp_path = os.path.join(UPLOADS_DIR, temp_filename)
+
     try:
-        image_data = base64.b64decode(body.image)
-        print(f"Decoded image size: {len(image_data)} bytes")
+        decoded_size = await asyncio.to_thread(
+            decode_base64_to_file, body.image, temp_path
+        )
+        print(f"Decoded image size: {decoded_size} bytes")
     except Exception as e:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
         raise HTTPException(status_code=400, detail=f"Invalid base64 image: {str(e)}")
 
     # Handle shoot: use existing, or create new project
@@ -1181,6 +1354,7 @@ async def mobile_enhance_base64(
             .first()
         )
         if not mobile_shoot:
+            os.remove(temp_path)
             raise HTTPException(status_code=404, detail="Project not found")
         print(f"Adding to existing project: {mobile_shoot.name} ({mobile_shoot.id})")
     else:
@@ -1190,34 +1364,17 @@ async def mobile_enhance_base64(
             # Auto-generate name: "Project Dec 11"
             project_name = f"Project {datetime.now().strftime('%b %d')}"
 
-        # Check for duplicate names and add suffix if needed
-        existing_count = (
-            db.query(Shoot)
-            .filter(Shoot.user_id == user.id, Shoot.name.like(f"{project_name}%"))
-            .count()
-        )
-
-        if existing_count > 0:
-            project_name = f"{project_name} ({existing_count + 1})"
-
-        mobile_shoot = Shoot(id=str(uuid.uuid4()), user_id=user.id, name=project_name)
-        db.add(mobile_shoot)
-        db.flush()
+        # Add a suffix if the name is already taken
+        mobile_shoot = create_shoot_with_unique_name(db, user.id, project_name)
         print(f"Created new project: {mobile_shoot.name} ({mobile_shoot.id})")
 
-    # Save image data temporarily
-    temp_filename = f"mobile_{uuid.uuid4()}_temp"
-    temp_path = os.path.join(UPLOADS_DIR, temp_filename)
-
-    with open(temp_path, "wb") as f:
-        f.write(image_data)
-
-    # Convert to JPG (handles HEIC and other formats)
+    # Convert to JPG (handles HEIC and other formats) in a worker thread so PIL
+    # doesn't block the event loop
     final_filename = f"mobile_{uuid.uuid4()}.jpg"
     file_path = os.path.join(UPLOADS_DIR, final_filename)
 
     try:
-        convert_to_jpg(temp_path, file_path)
+        await asyncio.to_thread(convert_to_jpg, temp_path, file_path)
         os.remove(temp_path)  # Remove temporary file
     except Exception as e:
         # If conversion fails, just use the original file
@@ -1255,59 +1412,24 @@ async def mobile_enhance_base64(
         mime_type="image/jpeg",
     )
     db.add(asset)
-    db.flush()
-
-    # Check or create credits with row-level lock to prevent race conditions
-    # Using FOR UPDATE ensures atomic read-check-modify operation
-    credit = (
-        db.query(Credit)
-        .filter(Credit.user_id == user.id)
-        .with_for_update()  # Lock the row to prevent concurrent modifications
-        .first()
-    )
-    if not credit:
-        credit = Credit(user_id=user.id, balance=0)
-        db.add(credit)
-        db.flush()
-        # Re-query with lock after creation
-        credit = (
-            db.query(Credit)
-            .filter(Credit.user_id == user.id)
-            .with_for_update()
-            .first()
-        )
-
-    if credit.balance < body.credit_cost:
-        raise HTTPException(status_code=402, detail="Insufficient credits")
-
-    # Deduct credits upfront (reservation) - will be refunded on failure
-    credit.balance -= body.credit_cost
-    db.flush()
 
     # Build merged prompt from style key (default + style)
     merged_prompt = build_prompt(body.style)
     logger.info(f"📝 [mobile/enhance-formdata] style_key={body.style!r} → merged prompt ({len(merged_prompt)} chars):\n{merged_prompt[:500]}...")
 
-    job = Job(
-        asset_id=asset.id,
-        user_id=user.id,
-        prompt=merged_prompt,
-        status=JobStatus.queued,
-        credits_used=body.credit_cost,
-    )
-    db.add(job)
-    db.flush()
-
-    # Create job event
-    event = JobEvent(
-        job_id=job.id,
-        event_type="created",
-        details=json.dumps(
-            {"source": "mobile_base64", "style": body.style, "credits_reserved": body.credit_cost}
-        ),
-    )
-    db.add(event)
-    db.commit()
+    # Deduct credits upfront (reservation) and create the asset, job and job
+    # event in one transaction - credits will be refunded on failure
+    try:
+        job = create_job_atomic(
+            db,
+            user.id,
+            asset.id,
+            merged_prompt,
+            body.credit_cost,
+            details={"source": "mobile_base64", "style": body.style, "credits_reserved": body.credit_cost},
+        )
+    except ValueError:
+        raise HTTPException(status_code=402, detail="Insufficient credits")
 
     print(f"Job created: {job.id}")
 
@@ -1369,7 +1491,7 @@ def mobile_get_credits(
         logger.warning(
             "Mobile credits called without authentication, using DEFAULT_USER_ID"
         )
-        user = db.query(User).filter(User.id == DEFAULT_USER_ID).first()
+        user = db.get(User, DEFAULT_USER_ID)
         if not user:
             user = User(id=DEFAULT_USER_ID, email="mobile@luster.ai")
             db.add(user)
@@ -1393,16 +1515,20 @@ def mobile_get_credits(
     }
 
 
+# Style list is static, so build and JSON-encode the response once at import
+MOBILE_STYLES = tuple(
+    {"id": key, "name": name, "description": f"{name} enhancement style"}
+    for key, name in get_available_styles().items()
+)
+MOBILE_STYLES_BODY = json.dumps(
+    {"styles": MOBILE_STYLES}, ensure_ascii=False, separators=(",", ":")
+).encode("utf-8")
+
+
 @app.get("/api/mobile/styles")
 def mobile_get_styles():
     """Get available enhancement styles for mobile"""
-    styles = get_available_styles()
-    return {
-        "styles": [
-            {"id": key, "name": name, "description": f"{name} enhancement style"}
-            for key, name in styles.items()
-        ]
-    }
+    return Response(content=MOBILE_STYLES_BODY, media_type="application/json")
 
 
 @app.get("/api/mobile/listings")
@@ -1447,7 +1573,7 @@ def mobile_get_listings(
             if R2_ENABLED and job.output_path and not job.output_path.startswith("/"):
                 try:
                     # Get asset for filename
-                    asset = db.query(Asset).filter(Asset.id == job.asset_id).first()
+                    asset = db.get(Asset, job.asset_id)
                     filename = (
                         f"enhanced_{asset.original_filename}"
                         if asset
@@ -1578,6 +1704,7 @@ def delete_project(
 
 @app.post("/api/mobile/users/sync")
 def sync_user(
+    request: Request,
     db: Session = Depends(get_db),
     user: User = Depends(get_current_user),
 ):
@@ -1586,16 +1713,18 @@ def sync_user(
     Called after social login to ensure user exists in our DB.
     Returns user info and credit balance.
     """
-    # Get or create credits for user
-    credit = db.query(Credit).filter(Credit.user_id == user.id).first()
-    is_new = credit is None
+    # get_current_user provisions first-time users and flags the request
+    is_new = getattr(request.state, "user_provisioned", False)
 
+    # Credit row is loaded together with the user by get_current_user
+    credit = user.credits
     if not credit:
         # New users start with 0 credits - must purchase
         credit = Credit(user_id=user.id, balance=0)
         db.add(credit)
         db.commit()
         db.refresh(credit)
+        is_new = True
 
     return {
         "user_id": str(user.id),
@@ -1612,7 +1741,8 @@ def mobile_get_credits_balance(
 ):
     """Get user credit balance for mobile (requires auth)"""
 
-    credit = db.query(Credit).filter(Credit.user_id == user.id).first()
+    # Credit row is loaded together with the user by get_current_user
+    credit = user.credits
 
     if not credit:
         # New users start with 0 credits - must purchase
@@ -1631,7 +1761,7 @@ def mobile_get_credits_balance(
 class MobilePresignRequest(BaseModel):
     filename: str
     content_type: str = "image/jpeg"
-    file_size: int = 10 * 1024 * 1024
+    file_size: int = DEFAULT_UPLOAD_SIZE_BYTES
 
 
 @app.post("/api/mobile/uploads/presign")
@@ -1653,9 +1783,14 @@ def mobile_presign_upload(
     )
 
     if not mobile_shoot:
-        mobile_shoot = Shoot(user_id=user.id, name="Mobile Uploads")
-        db.add(mobile_shoot)
-        db.flush()
+        mobile_shoot = _add_shoot_if_name_free(db, user.id, "Mobile Uploads")
+    if not mobile_shoot:
+        # A concurrent request created it first
+        mobile_shoot = (
+            db.query(Shoot)
+            .filter(Shoot.user_id == user.id, Shoot.name == "Mobile Uploads")
+            .one()
+        )
 
     # Generate asset ID and object key
     asset_id = str(uuid.uuid4())
@@ -17,6 +17,16 @@ _lock = threading.Lock()
 class RequestTracker:
     """Track individual requests through the system"""
 
+    # One tracker is allocated per request; slots avoid a per-instance __dict__
+    __slots__ = (
+        "request_id",
+        "endpoint",
+        "method",
+        "start_time",
+        "phases",
+        "metadata",
+    )
+
     def __init__(self, request_id: str, endpoint: str, method: str) -> None:
         self.request_id = request_id
         self.endpoint = endpoint
@@ -72,7 +72,7 @@ async def verify_webhook_signature(request: Request, body: bytes) -> bool:
 
 def get_or_create_user(app_user_id: str, email: Optional[str], db: Session) -> User:
     """Get existing user or create new one"""
-    user = db.query(User).filter(User.id == app_user_id).first()
+    user = db.get(User, app_user_id)
 
     if not user:
         user = User(id=app_user_id, email=email or f"{app_user_id}@luster.ai")
@@ -137,7 +137,7 @@ def handle_renewal(event_data: Dict[str, Any], db: Session) -> None:
     logger.info(f"Subscription renewal: user={app_user_id}, product={product_id}")
 
     # Get user and credit
-    user = db.query(User).filter(User.id == app_user_id).first()
+    user = db.get(User, app_user_id)
     if not user:
         logger.warning(f"User not found for renewal: {app_user_id}")
         return
@@ -1,8 +1,10 @@
 #!/usr/bin/env python3
 
+import functools
 import logging
 import os
-from typing import Dict, Optional
+import time
+from typing import BinaryIO, Dict, Optional
 
 import boto3
 from botocore.config import Config
@@ -13,6 +15,10 @@ load_dotenv()
 
 logger = logging.getLogger(__name__)
 
+# Presigned download URLs kept for reuse; each is reused for at most half its
+# lifetime, so a cached URL always has at least that much validity left
+PRESIGNED_URL_CACHE_SIZE = 4096
+
 
 class R2Client:
     """Cloudflare R2 storage client using S3-compatible API"""
@@ -66,6 +72,11 @@ class R2Client:
             ),
         )
 
+        # Signing is pure computation; repeat listings reuse recent URLs
+        self._cached_download_url = functools.lru_cache(
+            maxsize=PRESIGNED_URL_CACHE_SIZE
+        )(self._sign_download_url)
+
         logger.info(f"R2Client initialized for bucket: {self.bucket_name}")
 
     def generate_presigned_upload_url(
@@ -121,6 +132,8 @@ class R2Client:
         """
         Generate presigned GET URL for downloads
 
+        URLs are cached and reused while at least half their lifetime remains.
+
         Args:
             object_key: S3 object key (file path in bucket)
             expiration: URL expiration time in seconds
@@ -129,6 +142,18 @@ class R2Client:
         Returns:
             Presigned URL string
         """
+        # Cache key changes every expiration/2 seconds so entries age out
+        window = int(time.time() // max(expiration // 2, 1))
+        return self._cached_download_url(object_key, expiration, filename, window)
+
+    def _sign_download_url(
+        self,
+        object_key: str,
+        expiration: int,
+        filename: Optional[str],
+        window: int,
+    ) -> str:
+        """Sign a GET URL; window only distinguishes cache entries."""
         try:
             params = {
                 "Bucket": self.bucket_name,
@@ -194,6 +219,46 @@ class R2Client:
             logger.error(f"Failed to upload file to R2: {e}")
             raise
 
+    def upload_fileobj(
+        self,
+        fileobj: BinaryIO,
+        object_key: str,
+        content_type: Optional[str] = None,
+        metadata: Optional[Dict[str, str]] = None,
+    ) -> str:
+        """
+        Upload a readable binary file object to R2, streaming it in parts
+
+        Args:
+            fileobj: File object positioned at the start of the data
+            object_key: S3 object key (destination path in bucket)
+            content_type: MIME type of the file
+            metadata: Optional metadata dict
+
+        Returns:
+            Object key of uploaded file
+        """
+        try:
+            extra_args = {}
+            if content_type:
+                extra_args["ContentType"] = content_type
+            if metadata:
+                extra_args["Metadata"] = metadata
+
+            self.s3_client.upload_fileobj(
+                fileobj,
+                self.bucket_name,
+                object_key,
+                ExtraArgs=extra_args if extra_args else None,
+            )
+
+            logger.info(f"Uploaded file object to R2: {object_key}")
+            return object_key
+
+        except ClientError as e:
+            logger.error(f"Failed to upload file object to R2: {e}")
+            raise
+
     def download_file(
         self,
         object_key: str,
@@ -8,6 +8,7 @@ This module provides:
 - Consistent response schemas
 """
 
+from datetime import datetime
 from typing import Any
 from uuid import UUID
 
@@ -328,6 +329,38 @@ class CreditsResponse(BaseModel):
     updated_at: str | None = None
 
 
+# =============================================================================
+# Admin Schemas
+# =============================================================================
+
+
+class AdminJobSummary(BaseModel):
+    """Response schema for a job in the admin recent-jobs list."""
+
+    id: str
+    status: str
+    asset_id: str
+    user_id: str
+    credits_used: int | None = None
+    created_at: datetime
+    started_at: datetime | None = None
+    completed_at: datetime | None = None
+    error_message: str | None = None
+    processing_time_seconds: float | None = None
+
+
+class AdminRecentJobsResponse(BaseModel):
+    """Response schema for the admin recent-jobs list."""
+
+    jobs: list[AdminJobSummary]
+    count: int
+    has_more: bool
+    limit: int
+    next_cursor: datetime | None = None
+    next_cursor_id: str | None = None
+    total: int | None = None  # only with include_total=true
+
+
 # =============================================================================
 # Health Check Schemas
 # =============================================================================
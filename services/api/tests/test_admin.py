@@ -0,0 +1,177 @@
+"""
+Admin endpoint query tests
+"""
+
+import re
+import uuid
+from datetime import datetime
+
+import pytest
+from sqlalchemy import event
+
+from admin import _job_stats, _system_metrics, cached_ttl
+from database import Asset, Job, JobEvent
+from tests.conftest import TEST_USER_ID
+
+# A SQL function applied directly to an indexed timestamp column
+WRAPPED_TIMESTAMP = re.compile(r"\w+\(\s*jobs\.(created_at|completed_at)\b", re.I)
+
+
+def _where_clauses(db, fn):
+    """Run fn against db and return the top-level WHERE clause of each query"""
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    engine = db.get_bind()
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        fn(db)
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+
+    return [s.split("\nWHERE ", 1)[1] for s in statements if "\nWHERE " in s]
+
+
+class TestAdminStatsQueries:
+    """Time-window predicates must stay index-friendly"""
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("query", [_job_stats, _system_metrics])
+    def test_timestamp_columns_not_wrapped(self, test_db, query):
+        """Indexed timestamps are compared bare against a bound parameter"""
+        clauses = _where_clauses(test_db, query.__wrapped__)
+
+        assert clauses
+        for clause in clauses:
+            assert not WRAPPED_TIMESTAMP.search(clause), clause
+
+
+class TestStatsCache:
+    """Dashboard stats are memoized briefly per process"""
+
+    @pytest.mark.unit
+    def test_cached_until_refresh(self, test_db):
+        """Repeat calls reuse the result; refresh=True re-queries"""
+        calls = []
+
+        @cached_ttl(60)
+        def stats(db, hours):
+            calls.append(hours)
+            return {"hours": hours}
+
+        assert stats(test_db, 24) is stats(test_db, 24)
+        assert stats(test_db, 1) == {"hours": 1}
+        stats(test_db, 24, refresh=True)
+
+        assert calls == [24, 1, 24]
+
+
+class TestRecentJobs:
+    """Recent jobs list only counts the full result set on request"""
+
+    @pytest.mark.unit
+    def test_total_only_when_requested(self, client):
+        """Page size is reported as count; total needs include_total"""
+        response = client.get("/admin/jobs/recent?limit=5")
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["count"] == 0
+        assert data["has_more"] is False
+        assert "total" not in data
+
+        response = client.get("/admin/jobs/recent?limit=5&include_total=true")
+
+        assert response.json()["total"] == 0
+
+    @pytest.mark.unit
+    def test_limit_must_be_positive(self, client):
+        """limit=0 is rejected rather than crashing on an empty page"""
+        response = client.get("/admin/jobs/recent?limit=0")
+
+        assert response.status_code == 422
+
+    @pytest.mark.unit
+    def test_cursor_keeps_jobs_sharing_a_timestamp(self, client, test_db, test_user):
+        """Paging on (created_at, id) returns every job exactly once"""
+        created_at = datetime.utcnow().replace(microsecond=0)
+        asset = Asset(
+            shoot_id=str(uuid.uuid4()),
+            user_id=TEST_USER_ID,
+            original_filename="test.jpg",
+            file_path="/fake/path/test.jpg",
+            file_size=1000,
+            mime_type="image/jpeg",
+        )
+        test_db.add(asset)
+        test_db.flush()
+        for _ in range(3):
+            test_db.add(
+                Job(
+                    asset_id=asset.id,
+                    user_id=TEST_USER_ID,
+                    prompt="Enhance",
+                    created_at=created_at,
+                )
+            )
+        test_db.commit()
+
+        first = client.get("/admin/jobs/recent?limit=2").json()
+        assert first["has_more"] is True
+
+        second = client.get(
+            "/admin/jobs/recent",
+            params={
+                "limit": 2,
+                "before": first["next_cursor"],
+                "before_id": first["next_cursor_id"],
+            },
+        ).json()
+
+        ids = [job["id"] for job in first["jobs"] + second["jobs"]]
+        assert len(ids) == 3
+        assert len(set(ids)) == 3
+
+        # A last page that is exactly full has nothing after it
+        exact = client.get("/admin/jobs/recent?limit=3").json()
+        assert exact["count"] == 3
+        assert exact["has_more"] is False
+        assert exact["next_cursor"] is None
+
+
+class TestForceFail:
+    """Admin failures are recorded as structured job events"""
+
+    @pytest.mark.unit
+    def test_event_details_are_a_dict(self, client, test_db, test_user):
+        """force_failed events keep the same JSON shape as other events"""
+        asset = Asset(
+            shoot_id=str(uuid.uuid4()),
+            user_id=TEST_USER_ID,
+            original_filename="test.jpg",
+            file_path="/fake/path/test.jpg",
+            file_size=1000,
+            mime_type="image/jpeg",
+        )
+        test_db.add(asset)
+        test_db.flush()
+        job = Job(asset_id=asset.id, user_id=TEST_USER_ID, prompt="Enhance")
+        test_db.add(job)
+        test_db.commit()
+
+        response = client.post(f"/admin/jobs/{job.id}/force-fail")
+        assert response.status_code == 200
+
+        event = (
+            test_db.query(JobEvent)
+            .filter(JobEvent.job_id == job.id, JobEvent.event_type == "force_failed")
+            .one()
+        )
+        assert event.details == {
+            "reason": "force_failed",
+            "admin": True,
+            "old_status": "queued",
+            "credits_refunded": 0,
+        }
@@ -6,6 +6,7 @@ Note: Most endpoints require authentication. Tests use:
 - `authenticated_client` - Mocked JWT auth with TEST_USER_ID
 """
 
+import base64
 import uuid
 from io import BytesIO
 
@@ -30,6 +31,61 @@ class TestHealthEndpoint:
         assert "services" in data
         assert data["services"]["database"] == "healthy"
 
+    @pytest.mark.unit
+    def test_liveness_check(self, client):
+        """Liveness endpoint answers without checking services"""
+        response = client.get("/live")
+        assert response.status_code == 200
+        assert response.json() == {"status": "alive"}
+
+
+class TestRequestId:
+    """Request IDs from clients are only trusted when they are plain tokens"""
+
+    @staticmethod
+    def _bound_request_id(header: bytes) -> str:
+        import asyncio
+
+        import structlog
+
+        from logger import LoggingMiddleware
+
+        seen = {}
+
+        async def app(scope, receive, send):
+            seen["request_id"] = structlog.contextvars.get_contextvars()["request_id"]
+            await send({"type": "http.response.start", "status": 204, "headers": []})
+            await send({"type": "http.response.body", "body": b""})
+
+        async def send(message):
+            pass
+
+        scope = {
+            "type": "http",
+            "method": "GET",
+            "path": "/live",
+            "headers": [(b"x-request-id", header)],
+        }
+        asyncio.run(LoggingMiddleware(app)(scope, None, send))
+        return seen["request_id"]
+
+    @pytest.mark.unit
+    def test_plain_request_id_reused(self):
+        """A well-formed X-Request-ID becomes the log correlation ID"""
+        assert self._bound_request_id(b"edge-1.abc_DEF") == "edge-1.abc_DEF"
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize(
+        "header", [b"bad\nid", b'quote"id', b"x" * 65, b"caf\xe9"]
+    )
+    def test_unsafe_request_id_replaced(self, header):
+        """Anything else is replaced with a generated ID"""
+        request_id = self._bound_request_id(header)
+
+        assert request_id != header.decode("latin-1")
+        assert len(request_id) == 16
+        int(request_id, 16)
+
 
 class TestShootEndpoints:
     """Test shoot-related endpoints"""
@@ -55,6 +111,77 @@ class TestShootEndpoints:
         response = authenticated_client.post("/shoots", data={"name": ""})
         assert response.status_code == 422  # Validation error
 
+    @pytest.mark.api
+    def test_create_shoot_duplicate_name(self, authenticated_client, test_user):
+        """Test a repeated shoot name gets a numbered suffix"""
+        response = authenticated_client.post("/shoots", data={"name": "Test Shoot"})
+        assert response.status_code == 200
+        assert response.json()["name"] == "Test Shoot"
+
+        response = authenticated_client.post("/shoots", data={"name": "Test Shoot"})
+        assert response.status_code == 200
+        assert response.json()["name"] == "Test Shoot (2)"
+
+    @pytest.mark.unit
+    def test_unique_shoot_name_suffix(self, test_db, test_user):
+        """Test new projects get a numbered suffix when the name is taken"""
+        from main import create_shoot_with_unique_name
+
+        names = [
+            create_shoot_with_unique_name(test_db, TEST_USER_ID, "Project").name
+            for _ in range(3)
+        ]
+        test_db.commit()
+
+        assert names == ["Project", "Project (2)", "Project (3)"]
+
+    @pytest.mark.api
+    def test_list_shoots_aggregates_job_statuses(
+        self, authenticated_client, test_db, test_user
+    ):
+        """Test shoot listing counts assets and jobs per status"""
+        busy = Shoot(user_id=TEST_USER_ID, name="Busy Shoot")
+        empty = Shoot(user_id=TEST_USER_ID, name="Empty Shoot")
+        test_db.add_all([busy, empty])
+        test_db.flush()
+
+        for statuses in ([JobStatus.succeeded, JobStatus.failed], [JobStatus.queued]):
+            asset = Asset(
+                shoot_id=busy.id,
+                user_id=TEST_USER_ID,
+                original_filename="test.jpg",
+                file_path="/fake/path/test.jpg",
+                file_size=1000,
+                mime_type="image/jpeg",
+            )
+            test_db.add(asset)
+            test_db.flush()
+            for status in statuses:
+                test_db.add(
+                    Job(
+                        asset_id=asset.id,
+                        user_id=TEST_USER_ID,
+                        prompt="Enhance",
+                        status=status,
+                    )
+                )
+        test_db.commit()
+
+        response = authenticated_client.get("/shoots")
+        assert response.status_code == 200
+
+        shoots = {s["name"]: s for s in response.json()["shoots"]}
+        assert shoots["Busy Shoot"]["asset_count"] == 2
+        assert shoots["Busy Shoot"]["job_statuses"] == {
+            "queued": 1,
+            "processing": 0,
+            "succeeded": 1,
+            "failed": 1,
+        }
+        assert shoots["Busy Shoot"]["status"] == "in_progress"
+        assert shoots["Empty Shoot"]["asset_count"] == 0
+        assert shoots["Empty Shoot"]["status"] == "draft"
+
     @pytest.mark.api
     def test_get_shoot_assets_empty(self, authenticated_client, test_db, test_user):
         """Test getting assets for a shoot with no assets"""
@@ -158,6 +285,23 @@ class TestUploadEndpoints:
         assert response.status_code == 400
         assert "empty" in response.json()["detail"].lower()
 
+    def test_decode_base64_ignores_stray_characters(self, monkeypatch, tmp_path):
+        """Whitespace and stray characters don't break 4-char groups across chunks"""
+        import main
+
+        monkeypatch.setattr(main, "BASE64_DECODE_CHUNK_CHARS", 8)
+        raw = bytes(range(40))
+        encoded = base64.b64encode(raw).decode("ascii")
+        noisy = (
+            encoded[:3] + "\n" + encoded[3:10] + "*" + encoded[10:21] + " \r\n"
+        ) + encoded[21:]
+
+        output_path = tmp_path / "decoded.bin"
+        size = main.decode_base64_to_file(noisy, str(output_path))
+
+        assert size == len(raw)
+        assert output_path.read_bytes() == raw
+
 
 class TestJobEndpoints:
     """Test job-related endpoints"""
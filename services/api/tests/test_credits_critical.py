@@ -107,6 +107,62 @@ class TestCreditDeduction:
         test_db.refresh(credit)
         assert credit.balance == initial_balance - 2
 
+    @pytest.mark.api
+    def test_deduct_never_overdraws(self, test_db, test_user):
+        """Service deduction only succeeds while the balance covers it"""
+        from credit_service import deduct_credits
+
+        credit = Credit(user_id=TEST_USER_ID, balance=3)
+        test_db.add(credit)
+        test_db.commit()
+
+        assert deduct_credits(test_db, TEST_USER_ID, 2) == 1
+
+        with pytest.raises(ValueError, match="Available: 1"):
+            deduct_credits(test_db, TEST_USER_ID, 2)
+
+        test_db.commit()
+        test_db.refresh(credit)
+        assert credit.balance == 1
+
+    @pytest.mark.api
+    def test_create_job_atomic(self, test_db, test_user):
+        """Job, created event and deduction are committed together"""
+        from credit_service import create_job_atomic
+
+        credit = Credit(user_id=TEST_USER_ID, balance=3)
+        shoot = Shoot(user_id=TEST_USER_ID, name="Test Shoot")
+        test_db.add_all([credit, shoot])
+        test_db.flush()
+
+        asset = Asset(
+            shoot_id=shoot.id,
+            user_id=TEST_USER_ID,
+            original_filename="test.jpg",
+            file_path="/fake/path/test.jpg",
+            file_size=1000,
+            mime_type="image/jpeg",
+        )
+        test_db.add(asset)
+        test_db.commit()
+
+        job = create_job_atomic(
+            test_db, TEST_USER_ID, asset.id, "Enhance", 2, details={"tier": "premium"}
+        )
+
+        test_db.rollback()  # Nothing left uncommitted
+        test_db.refresh(credit)
+        assert credit.balance == 1
+        assert test_db.get(Job, job.id).credits_used == 2
+        event = test_db.query(JobEvent).filter(JobEvent.job_id == job.id).one()
+        assert event.event_type == "created"
+        assert event.details == {"tier": "premium"}
+
+        with pytest.raises(ValueError):
+            create_job_atomic(test_db, TEST_USER_ID, asset.id, "Enhance", 2)
+        test_db.rollback()
+        assert test_db.query(Job).count() == 1
+
 
 class TestCreditValidation:
     """Tests for credit balance validation"""
@@ -424,6 +480,123 @@ class TestCreditRefund:
         test_db.refresh(credit)
         assert credit.balance == 10
 
+    @pytest.mark.api
+    def test_bulk_refund_blocks_later_refund(self, authenticated_client, test_db, test_user):
+        """
+        Bulk refunds credit the user once per job and record refund events,
+        so the per-job refund endpoint won't pay out again.
+        """
+        from credit_service import refund_jobs_bulk
+
+        credit = Credit(user_id=TEST_USER_ID, balance=0)
+        test_db.add(credit)
+
+        shoot = Shoot(user_id=TEST_USER_ID, name="Test Shoot")
+        test_db.add(shoot)
+        test_db.flush()
+
+        asset = Asset(
+            shoot_id=shoot.id,
+            user_id=TEST_USER_ID,
+            original_filename="test.jpg",
+            file_path="/fake/path/test.jpg",
+            file_size=1000,
+            mime_type="image/jpeg",
+        )
+        test_db.add(asset)
+        test_db.flush()
+
+        jobs = [
+            Job(
+                asset_id=asset.id,
+                user_id=TEST_USER_ID,
+                prompt="Enhance",
+                status=JobStatus.failed,
+                credits_used=credits_used,
+            )
+            for credits_used in (1, 2, 0)
+        ]
+        test_db.add_all(jobs)
+        test_db.commit()
+
+        refunded = refund_jobs_bulk(test_db, jobs)
+        test_db.commit()
+
+        assert refunded == {jobs[0].id: 1, jobs[1].id: 2}
+        test_db.refresh(credit)
+        assert credit.balance == 3
+
+        events = (
+            test_db.query(JobEvent)
+            .filter(JobEvent.event_type == "credits_refunded")
+            .all()
+        )
+        assert sorted(event.details["credits_refunded"] for event in events) == [1, 2]
+        assert all(event.details["new_balance"] == 3 for event in events)
+
+        response = authenticated_client.post(f"/jobs/{jobs[0].id}/refund")
+        assert response.status_code == 400
+        assert "already refunded" in response.json()["detail"]
+
+
+class TestCreditLookup:
+    """Credit rows are memoized per session"""
+
+    @pytest.mark.unit
+    def test_repeat_lookup_reuses_row(self, test_db, test_user):
+        """A second lookup in the same session doesn't query again"""
+        from sqlalchemy import event
+
+        from credit_service import get_or_create_credit
+
+        test_db.add(Credit(user_id=TEST_USER_ID, balance=5))
+        test_db.commit()
+
+        statements = []
+
+        def capture(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        engine = test_db.get_bind()
+        event.listen(engine, "before_cursor_execute", capture)
+        try:
+            first = get_or_create_credit(test_db, TEST_USER_ID)
+            second = get_or_create_credit(test_db, TEST_USER_ID)
+        finally:
+            event.remove(engine, "before_cursor_execute", capture)
+
+        assert first is second
+        assert first.balance == 5
+        assert len(statements) == 1
+
+    @pytest.mark.unit
+    def test_reuses_credit_loaded_with_user(self, test_db, test_user):
+        """The credit row auth loaded alongside the user needs no query"""
+        from sqlalchemy import event
+
+        from auth import _load_user
+        from credit_service import get_or_create_credit
+
+        test_db.add(Credit(user_id=TEST_USER_ID, balance=5))
+        test_db.commit()
+        test_db.expunge_all()
+        user = _load_user(TEST_USER_ID, test_db)
+
+        statements = []
+
+        def capture(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        engine = test_db.get_bind()
+        event.listen(engine, "before_cursor_execute", capture)
+        try:
+            credit = get_or_create_credit(test_db, TEST_USER_ID)
+        finally:
+            event.remove(engine, "before_cursor_execute", capture)
+
+        assert credit is user.credits
+        assert statements == []
+
 
 class TestJobStatusTransitions:
     """Tests for valid job status transitions"""
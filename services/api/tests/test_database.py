@@ -257,13 +257,13 @@ class TestJobEventModel:
         test_db.flush()
 
         event = JobEvent(
-            job_id=job.id, event_type="created", details='{"test": "data"}'
+            job_id=job.id, event_type="created", details={"test": "data"}
         )
         test_db.add(event)
         test_db.commit()
 
         assert event.event_type == "created"
-        assert event.details == '{"test": "data"}'
+        assert event.details == {"test": "data"}
         assert event.job == job
 
 
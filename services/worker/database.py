@@ -6,7 +6,8 @@ from datetime import datetime
 from dotenv import load_dotenv
 from sqlalchemy import Column, DateTime
 from sqlalchemy import Enum as SQLEnum
-from sqlalchemy import ForeignKey, Integer, String, Text, Uuid, create_engine
+from sqlalchemy import JSON, ForeignKey, Integer, String, Text, Uuid, create_engine
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship, sessionmaker
 
@@ -136,7 +137,7 @@ class JobEvent(Base):
     id = Column(UUIDType, primary_key=True, default=generate_uuid)
     job_id = Column(UUIDType, ForeignKey("jobs.id"), nullable=False)
     event_type = Column(String(50), nullable=False)
-    details = Column(Text)  # JSON as text for simplicity
+    details = Column(JSON().with_variant(JSONB(), "postgresql"))
     created_at = Column(DateTime, default=datetime.utcnow)
 
     job = relationship("Job", back_populates="events")
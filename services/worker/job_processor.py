@@ -2,7 +2,6 @@
 RQ Job processor for image enhancement tasks
 """
 
-import json
 import os
 import uuid
 from datetime import datetime
@@ -69,10 +68,7 @@ def process_image_enhancement(job_id: str):
                 .first()
             )
             if creation_event and creation_event.details:
-                if isinstance(creation_event.details, str):
-                    details = json.loads(creation_event.details)
-                else:
-                    details = creation_event.details
+                details = creation_event.details
                 tier = details.get("tier", "premium")
         except Exception as e:
             print(f"Could not extract tier: {e}")
@@ -187,7 +183,7 @@ def add_job_event(db: Session, job_id: str, event_type: str, details: dict):
     """Add a job event to the audit trail"""
     try:
         event = JobEvent(
-            job_id=job_id, event_type=event_type, details=json.dumps(details)
+            job_id=job_id, event_type=event_type, details=details
         )
         db.add(event)
         db.commit()
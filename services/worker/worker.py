@@ -241,7 +241,7 @@ class Worker:
                         JobEvent.event_type == "created"
                     ).first()
                     if creation_event and creation_event.details:
-                        details = json.loads(creation_event.details)
+                        details = creation_event.details
                         tier = details.get("tier", "premium")
                         style_preset = details.get("style", "default")
                         print(f"Extracted from job events - tier: {tier}, style: {style_preset}")
@@ -456,7 +456,7 @@ class Worker:
             event = JobEvent(
                 job_id=job_id,
                 event_type=event_type,
-                details=json.dumps(details)
+                details=details
             )
             self.db.add(event)
             self.db.commit()